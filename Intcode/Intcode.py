@@ -1,9 +1,19 @@
+import hashlib
+import mmap
+import os.path
+import struct
+import tempfile
 from itertools import zip_longest
-from collections import defaultdict
-from typing import Iterator
+from array import array
+from collections import deque
+from enum import Enum
+from typing import TYPE_CHECKING, Callable, Iterator, NamedTuple, Self, Sequence
+
+if TYPE_CHECKING:
+    from profiling import Profiler
 
 type Program = list[int]
-type Memory = defaultdict[int, int]
+type Page = array[int] | list[int] | memoryview  # memoryview: shared page of a mapped program
 
 type Value = int
 type Address = int
@@ -12,10 +22,184 @@ type OpCode = int
 type Parameter = int
 type ParameterMode = int
 type Argument = tuple[Parameter, ParameterMode]
+type Instruction = tuple[OpCode, Callable[..., None], tuple[ParameterMode, ...]]
+
+# memory is split into pages of PAGE_SIZE cells
+PAGE_BITS = 9
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
+ZERO_PAGE = array("q", bytes(8 * PAGE_SIZE))
+
+
+def new_page(values: Sequence[int] = ()) -> array[int] | list[int]:
+    # int64 cells, Python ints as soon as a value does not fit anymore
+    page: array[int] | list[int]
+    try:
+        page = array("q", values)
+    except OverflowError:
+        page = list(values)
+    page.extend(ZERO_PAGE[len(values):])
+    return page
+
+
+class Memory:
+    __slots__ = ["pages", "owned", "clean", "dirty"]
+
+    def __init__(self, program: Sequence[int] = ()) -> None:
+        # the program region is paged in one go, everything else on first write
+        self.pages: dict[int, Page] = {}
+        # pages that are not shared with a fork or a mapped file and can be written in place
+        self.owned: set[int] = set()
+        for index, start in enumerate(range(0, len(program), PAGE_SIZE)):
+            values = program[start:start+PAGE_SIZE]
+            if isinstance(values, memoryview) and len(values) == PAGE_SIZE:
+                self.pages[index] = values  # full pages of a mapped program are used in place
+            else:
+                self.pages[index] = new_page(values)
+                self.owned.add(index)
+        # pages of our own that were not written since take_dirty, and the ones that were
+        self.clean: set[int] = set()
+        self.dirty: set[int] = set(self.owned)
+
+    def fork(self) -> "Memory":
+        # copy-on-write: both sides copy a page before their first write to it
+        clone = Memory.__new__(Memory)
+        clone.pages = self.pages.copy()
+        clone.owned = set()
+        clone.clean = set()
+        clone.dirty = set()
+        self.owned.clear()
+        self.clean.clear()
+        return clone
+
+    def take_dirty(self) -> set[int]:
+        # pages written since the last call; the next write to any page takes the slow path of
+        # __setitem__ once more, which marks it dirty again
+        dirty = self.dirty
+        self.dirty = set()
+        self.clean |= self.owned
+        self.owned.clear()
+        return dirty
+
+    def __getitem__(self, address: int) -> int:
+        page = self.pages.get(address >> PAGE_BITS)
+        if page is None:
+            return 0
+        return page[address & PAGE_MASK]
+
+    def __setitem__(self, address: int, value: int) -> None:
+        index = address >> PAGE_BITS
+        page = self.pages.get(index)
+        if index not in self.owned:
+            if index in self.clean:  # ours already, only the write has to be noted
+                self.clean.remove(index)
+            else:
+                if page is None:
+                    if value == 0:  # unallocated pages read as zero anyway
+                        return
+                    page = new_page()
+                elif isinstance(page, memoryview):
+                    page = new_page(page)
+                else:
+                    page = page[:]
+                self.pages[index] = page
+            self.owned.add(index)
+            self.dirty.add(index)
+        assert page is not None  # owned and clean pages always exist
+        try:
+            page[address & PAGE_MASK] = value
+        except OverflowError:  # value exceeds 64 bits
+            page = self.pages[index] = list(page)
+            page[address & PAGE_MASK] = value
+
+
+# binary program cache: magic, program length, sha256 of the payload; padded to keep the int64 payload aligned
+HEADER = struct.Struct("<4s4xQ32s")
+MAGIC = b"ICB1"
+EXTENSION = ".icb"
+
+
+def cache_path(input_path: str) -> str:
+    # dayXX/input.txt -> dayXX/input.icb
+    return os.path.splitext(input_path)[0] + EXTENSION
+
+
+def write_cache(path: str, program: Program) -> None:
+    payload = array("q", program).tobytes()  # OverflowError for values beyond int64
+    # written next to it and swapped in, so processes that still map the old file keep reading it
+    fd, tmp_path = tempfile.mkstemp(EXTENSION, dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(program), hashlib.sha256(payload).digest()))
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def read_cache(path: str) -> memoryview | None:
+    # the program as read-only int64 view of the mapped file, None if the file is not a valid cache
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            return None
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, length, digest = HEADER.unpack_from(data)
+    payload = memoryview(data)[HEADER.size:]
+    if magic != MAGIC or len(payload) != 8 * length or hashlib.sha256(payload).digest() != digest:
+        return None
+    return payload.cast("q")
+
+
+def load_program(input_path: str) -> Program | memoryview:
+    """Loads a comma separated program through its binary cache next to it.
+
+    The cache is used if it is at least as new as the text file and valid, otherwise the text is parsed
+    and the cache (re)written. A cached program comes back as memory-mapped, read-only memoryview that
+    Computer.load accepts as is: full pages are shared with the file until they are written to.
+    """
+    path = cache_path(input_path)
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(input_path):
+        cached = read_cache(path)
+        if cached is not None:
+            return cached
+
+    with open(input_path) as f:
+        data = f.read()
+    program = list(map(int, data.split(",")))
+    try:
+        write_cache(path, program)
+    except (OSError, OverflowError):  # read-only directory or values beyond int64, the text still works
+        pass
+    return program
+
+
+class Status(Enum):
+    NEEDS_INPUT = "needs input"
+    OUTPUT_READY = "output ready"
+    PAUSED = "paused"  # step budget used up
+    HALTED = "halted"
+
+
+# step budget of run_until if none is given
+UNLIMITED = 1 << 62
+
+
+class Snapshot(NamedTuple):
+    memory: Memory
+    pointer: int
+    relative_base: int
+    terminated: bool
+    input_values: tuple[int, ...]
+    output_values: tuple[int, ...]
+    input_default: int | None
+    decoded: dict[Address, Instruction]
+    steps: int
 
 
 class Computer:
-    __slots__ = ["memory", "pointer", "relative_base", "terminated", "input_values", "output_values", "input_default"]
+    __slots__ = ["memory", "pointer", "relative_base", "terminated", "input_values", "output_values", "input_default",
+                 "decoded", "steps", "profiler"]
 
     # opcode: method,arity
     opcodes: dict[int, tuple[str, int]] = {
@@ -31,30 +215,127 @@ class Computer:
         99: ("terminate", 0),
     }
 
-    def __init__(self, program: Program, input_values: list[int]) -> None:
+    def __init__(self, program: Program | memoryview, input_values: list[int]) -> None:
         self.load(program, input_values)
 
-    def load(self, program: Program, input_values: list[int] = []) -> None:
-        self.memory: Memory = defaultdict(int, {i: x for i, x in enumerate(program)})
+    def load(self, program: Program | memoryview, input_values: list[int] = []) -> None:
+        # program: a list or the memoryview of a cached program, see load_program
+        self.memory: Memory = Memory(program)
         self.pointer: int = 0
         self.relative_base: int = 0
         self.terminated: bool = False
-        self.input_values: list[int] = input_values
+        self.input_values: deque[int] = deque(input_values)
         self.input_default: int | None = None
+        # any sink with append/clear/iteration works, see sinks.py; records() needs a list or deque
         self.output_values: list[int] = []
+        # decoded instructions by address, an entry is dropped when its address is written to
+        self.decoded: dict[Address, Instruction] = {}
+        # executed instructions
+        self.steps: int = 0
+        # opt-in, see profiling.py
+        self.profiler: Profiler | None = None
 
     def run(self, loop: bool = False) -> None:
-        while not self.terminated:
-            opcode, modes = self.split(self[self.pointer])
-            if opcode not in Computer.opcodes:
-                raise ValueError(f"Invalid opcode {opcode}")
-            method, arity = Computer.opcodes[opcode]
-            params: list[Parameter] = [self[i] for i in range(self.pointer+1, self.pointer+arity+1)]
-            arguments: list[Argument] = list(zip_longest(params, modes, fillvalue=0))
-            execute = getattr(self, method)
-            execute(*arguments)
-            if opcode == 4 and loop:  # a bit hacky
-                return
+        # loop: return after a single output
+        if self.run_until(1 if loop else None) is Status.NEEDS_INPUT:
+            raise ValueError("No value provided for input instruction")
+
+    def run_until(self, outputs: int | None = None, max_steps: int | None = None) -> Status:
+        # runs until the program halts, waits for input or (if given) produced that many outputs
+        # or executed that many instructions
+        if self.profiler is not None:
+            return self.profiler.run_until(self, outputs, max_steps)
+        memory = self.memory
+        # parameters are read from the pages directly, Memory.__getitem__ is only the fallback
+        pages = memory.pages
+        decoded = self.decoded
+        produced = 0
+        start = budget = UNLIMITED if max_steps is None else max_steps
+        try:
+            while not self.terminated:
+                if budget <= 0:
+                    return Status.PAUSED
+                pointer = self.pointer
+                instruction = decoded.get(pointer)
+                if instruction is None:
+                    instruction = decoded[pointer] = self.decode(pointer)
+                opcode, execute, modes = instruction
+                if opcode == 3 and not self.input_values and self.input_default is None:
+                    return Status.NEEDS_INPUT
+                budget -= 1
+                page = pages.get(pointer >> PAGE_BITS)
+                offset = pointer & PAGE_MASK
+                if page is not None and offset + len(modes) < PAGE_SIZE:
+                    arguments: list[Argument] = [(page[offset+i], mode) for i, mode in enumerate(modes, 1)]
+                else:  # the instruction crosses a page border
+                    arguments = [(memory[pointer+i], mode) for i, mode in enumerate(modes, 1)]
+                execute(self, *arguments)
+                if opcode == 4 and outputs is not None:
+                    produced += 1
+                    if produced == outputs:
+                        return Status.OUTPUT_READY
+        finally:
+            self.steps += start - budget
+        return Status.HALTED
+
+    def take_outputs(self) -> list[int]:
+        # all pending outputs at once
+        outputs = list(self.output_values)
+        self.output_values.clear()
+        return outputs
+
+    def records(self, arity: int) -> Iterator[tuple[int, ...]]:
+        # runs the program and yields its outputs in records of `arity` values, input can be added in between;
+        # the outputs have to stay in output_values, so this works with the default list or a deque
+        outputs = self.output_values
+        if not isinstance(outputs, list | deque) or (isinstance(outputs, deque) and (outputs.maxlen or arity) < arity):
+            raise TypeError(f"Records of {arity} values cannot be taken from a {type(outputs).__name__} sink.")
+        while True:
+            if len(outputs) < arity:
+                status = self.run_until(arity - len(outputs))
+                if status is Status.NEEDS_INPUT:
+                    raise ValueError("No value provided for input instruction")
+                if status is Status.HALTED:  # an incomplete record stays in output_values
+                    return
+            if isinstance(outputs, deque):
+                record = tuple(outputs.popleft() for _ in range(arity))
+            else:
+                record = tuple(outputs[:arity])
+                del outputs[:arity]
+            yield record
+
+    def snapshot(self) -> Snapshot:
+        # memory pages are shared copy-on-write, so snapshots are cheap
+        return Snapshot(self.memory.fork(), self.pointer, self.relative_base, self.terminated,
+                        tuple(self.input_values), tuple(self.output_values), self.input_default, self.decoded.copy(),
+                        self.steps)
+
+    @classmethod
+    def resume(cls, snapshot: Snapshot) -> Self:
+        # a snapshot can be resumed any number of times, each machine is independent
+        computer = cls.__new__(cls)
+        computer.load([], list(snapshot.input_values))
+        computer.memory = snapshot.memory.fork()
+        computer.pointer = snapshot.pointer
+        computer.relative_base = snapshot.relative_base
+        computer.terminated = snapshot.terminated
+        computer.output_values = list(snapshot.output_values)
+        computer.input_default = snapshot.input_default
+        computer.decoded = snapshot.decoded.copy()
+        computer.steps = snapshot.steps
+        return computer
+
+    def fork(self) -> Self:
+        return self.resume(self.snapshot())
+
+    def decode(self, address: Address) -> Instruction:
+        opcode, modes = self.split(self[address])
+        if opcode not in Computer.opcodes:
+            raise ValueError(f"Invalid opcode {opcode}")
+        method, arity = Computer.opcodes[opcode]
+        # missing modes default to position mode
+        padded = tuple(mode for mode, _ in zip_longest(modes[:arity], range(arity), fillvalue=0))
+        return opcode, getattr(type(self), method), padded
 
     # we cant have a "real pointer" for elements in our memory dict
     # solution: split write and read operations into two functions: get_address and get_value
@@ -70,14 +351,18 @@ class Computer:
                 raise ValueError(f"Invalid parameter mode {mode}.")
 
     def get_value(self, argument: Argument) -> Value:
+        # Memory.__getitem__ inlined, this is the hottest read
         parameter, mode = argument
         match mode:
             case 0:  # position mode
-                return self[parameter]
+                page = self.memory.pages.get(parameter >> PAGE_BITS)
+                return 0 if page is None else page[parameter & PAGE_MASK]
             case 1:  # immediate mode
                 return parameter
             case 2:  # relative mode
-                return self[self.relative_base + parameter]
+                address = self.relative_base + parameter
+                page = self.memory.pages.get(address >> PAGE_BITS)
+                return 0 if page is None else page[address & PAGE_MASK]
             case _:
                 raise ValueError(f"Invalid parameter mode {mode}.")
 
@@ -103,7 +388,7 @@ class Computer:
 
     def input(self, z: Argument) -> None:
         if len(self.input_values) > 0:
-            self[self.get_address(z)] = self.input_values.pop(0)
+            self[self.get_address(z)] = self.input_values.popleft()
             self.pointer += 2
         elif self.input_default is not None:
             self[self.get_address(z)] = self.input_default
@@ -149,7 +434,14 @@ class Computer:
         return self.memory[address]
 
     def __setitem__(self, address: Address, value: Value) -> None:
-        self.memory[address] = value
+        memory = self.memory
+        index = address >> PAGE_BITS
+        if index in memory.owned and -1 << 63 <= value < 1 << 63:  # write in place, no bookkeeping
+            memory.pages[index][address & PAGE_MASK] = value
+        else:
+            memory[address] = value
+        if address in self.decoded:  # self-modifying code
+            del self.decoded[address]
 
     def __str__(self) -> str:
         return ",".join(str(x) for x in self.output_values)
@@ -1 +1,11 @@
-from .Intcode import Computer
\ No newline at end of file
+from .Intcode import *  # noqa: F403
+from .closure import ClosureComputer  # noqa: F401
+from .jit import JitComputer  # noqa: F401
+from .batch import BatchComputer  # noqa: F401
+from .sweep import sweep, Max, FirstMatch  # noqa: F401
+from .aio import AsyncComputer  # noqa: F401
+from .network import Network  # noqa: F401
+from .profiling import Profiler  # noqa: F401
+from .sinks import Callback, Records, ring_buffer, attach  # noqa: F401
+from .checkpoint import Checkpoint  # noqa: F401
+from .symbolic import Affine, SymbolicError, run_symbolic, solve  # noqa: F401
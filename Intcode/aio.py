@@ -0,0 +1,54 @@
+import asyncio
+from typing import Protocol
+
+from Intcode import Computer, Program, Status
+
+# instructions between two yields to the event loop
+TIME_SLICE = 10_000
+
+
+class Channel(Protocol):
+    # the part of asyncio.Queue an AsyncComputer needs
+    async def get(self) -> int: ...
+    async def put(self, value: int) -> None: ...
+    def get_nowait(self) -> int: ...
+    def empty(self) -> bool: ...
+
+
+class AsyncComputer(Computer):
+    """Computer that runs as a coroutine and talks through awaitable channels.
+
+    `run_async` hands control back to the event loop only while it waits for input, while the outbox
+    is full or after `time_slice` instructions, so many machines can share one thread.
+    """
+    __slots__ = ["inbox", "outbox", "time_slice"]
+
+    def load(self, program: Program | memoryview, input_values: list[int] = []) -> None:
+        super().load(program, input_values)
+        self.inbox: Channel | None = None
+        self.outbox: Channel | None = None
+        self.time_slice: int = TIME_SLICE
+
+    def connect(self, inbox: Channel | None, outbox: Channel | None) -> None:
+        # without an outbox, outputs stay in output_values
+        self.inbox = inbox
+        self.outbox = outbox
+
+    async def run_async(self) -> None:
+        while True:
+            status = self.run_until(max_steps=self.time_slice)
+            if self.outbox is not None:
+                for value in self.take_outputs():
+                    await self.outbox.put(value)
+
+            match status:
+                case Status.HALTED:
+                    return
+                case Status.NEEDS_INPUT:
+                    if self.inbox is None:
+                        raise ValueError("No value provided for input instruction")
+                    self.add_input(await self.inbox.get())
+                    while not self.inbox.empty():  # take what is there already in one go
+                        self.add_input(self.inbox.get_nowait())
+                case _:
+                    await asyncio.sleep(0)
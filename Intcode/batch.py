@@ -0,0 +1,151 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+from Intcode import Program
+
+# values beyond this might have wrapped around in int64, such machines are marked as failed
+SAFE_VALUE = 2**62
+MAX_MEMORY = 1 << 24
+
+
+class BatchComputer:
+    """N copies of one Intcode program executed in lockstep.
+
+    Memory is an (N, size) int64 array, pointers and relative bases are vectors. Each step groups the
+    running machines by the instruction word at their pointer and executes every group with a handful of
+    array operations, so machines that diverge simply end up in different groups.
+    Machines halt (terminated), run out of input (blocked) or hit an invalid instruction, a negative
+    address or a value too large for int64 (failed). Failed machines are left for the scalar Computer.
+    """
+
+    def __init__(self, program: Program | memoryview, n: int, input_values: Sequence[Sequence[int]] = ()) -> None:
+        self.memory = np.tile(np.array(program, dtype=np.int64), (n, 1))
+        self.pointer = np.zeros(n, dtype=np.int64)
+        self.relative_base = np.zeros(n, dtype=np.int64)
+        self.terminated = np.zeros(n, dtype=bool)
+        self.blocked = np.zeros(n, dtype=bool)
+        self.failed = np.zeros(n, dtype=bool)
+
+        # ragged inputs are padded, input_count tells how many are real
+        width = max((len(values) for values in input_values), default=0)
+        self.inputs = np.zeros((n, max(width, 1)), dtype=np.int64)
+        self.input_count = np.zeros(n, dtype=np.int64)
+        for i, values in enumerate(input_values):
+            self.inputs[i, :len(values)] = values
+            self.input_count[i] = len(values)
+        self.input_index = np.zeros(n, dtype=np.int64)
+        self.output_values: list[list[int]] = [[] for _ in range(n)]
+
+    @property
+    def running(self) -> np.ndarray:
+        return ~(self.terminated | self.blocked | self.failed)
+
+    def run(self, max_steps: int = 10**7) -> None:
+        for _ in range(max_steps):
+            machines = np.flatnonzero(self.running)
+            if machines.size == 0:
+                return
+            machines = machines[self.ensure(machines, self.pointer[machines] + 3)]
+            words = self.memory[machines, self.pointer[machines]]
+            for word in np.unique(words):
+                self.execute(int(word), machines[words == word])
+        raise ValueError("Max iterations reached.")
+
+    def execute(self, word: int, machines: np.ndarray) -> None:
+        opcode = word % 100
+        modes = (word // 100 % 10, word // 1000 % 10, word // 10000 % 10)
+        pointer = self.pointer[machines]
+
+        match opcode:
+            case 1 | 2 | 7 | 8:
+                x = self.values(machines, pointer, 1, modes[0])
+                y = self.values(machines, pointer, 2, modes[1])
+                if opcode == 1:
+                    value = x + y
+                    self.failed[machines[np.abs(x.astype(float) + y) >= SAFE_VALUE]] = True
+                elif opcode == 2:
+                    value = x * y
+                    self.failed[machines[np.abs(x.astype(float) * y) >= SAFE_VALUE]] = True
+                else:
+                    value = (x < y if opcode == 7 else x == y).astype(np.int64)
+                machines, pointer, value = self.healthy(machines, pointer, value)
+                self.write(machines, pointer, 3, modes[2], value)
+                machines, pointer = self.healthy(machines, pointer)
+                self.pointer[machines] = pointer + 4
+            case 3:
+                available = self.input_index[machines] < self.input_count[machines]
+                self.blocked[machines[~available]] = True
+                machines, pointer = machines[available], pointer[available]
+                value = self.inputs[machines, self.input_index[machines]]
+                self.write(machines, pointer, 1, modes[0], value)
+                machines, pointer = self.healthy(machines, pointer)
+                self.input_index[machines] += 1
+                self.pointer[machines] = pointer + 2
+            case 4:
+                x = self.values(machines, pointer, 1, modes[0])
+                machines, pointer, x = self.healthy(machines, pointer, x)
+                for machine, value in zip(machines.tolist(), x.tolist()):
+                    self.output_values[machine].append(value)
+                self.pointer[machines] = pointer + 2
+            case 5 | 6:
+                x = self.values(machines, pointer, 1, modes[0])
+                y = self.values(machines, pointer, 2, modes[1])
+                machines, pointer, x, y = self.healthy(machines, pointer, x, y)
+                jump = x != 0 if opcode == 5 else x == 0
+                self.pointer[machines] = np.where(jump, y, pointer + 3)
+            case 9:
+                x = self.values(machines, pointer, 1, modes[0])
+                machines, pointer, x = self.healthy(machines, pointer, x)
+                self.relative_base[machines] += x
+                self.pointer[machines] = pointer + 2
+            case 99:
+                self.terminated[machines] = True
+            case _:
+                self.failed[machines] = True
+
+    def healthy(self, machines: np.ndarray, *arrays: np.ndarray) -> tuple[np.ndarray, ...]:
+        # drops the machines that failed (and their entries in the other arrays)
+        keep = ~self.failed[machines]
+        return machines[keep], *(array[keep] for array in arrays)
+
+    def values(self, machines: np.ndarray, pointer: np.ndarray, offset: int, mode: int) -> np.ndarray:
+        parameter = self.memory[machines, pointer + offset]
+        match mode:
+            case 1:  # immediate mode
+                return parameter
+            case 0:  # position mode
+                address = parameter
+            case 2:  # relative mode
+                address = self.relative_base[machines] + parameter
+            case _:
+                self.failed[machines] = True
+                return parameter
+        valid = self.ensure(machines, address)
+        return np.where(valid, self.memory[machines, np.where(valid, address, 0)], 0)
+
+    def write(self, machines: np.ndarray, pointer: np.ndarray, offset: int, mode: int, value: np.ndarray) -> None:
+        parameter = self.memory[machines, pointer + offset]
+        match mode:
+            case 0:  # position mode
+                address = parameter
+            case 2:  # relative mode
+                address = self.relative_base[machines] + parameter
+            case _:
+                self.failed[machines] = True
+                return
+        valid = self.ensure(machines, address)
+        self.memory[machines[valid], address[valid]] = value[valid]
+
+    def ensure(self, machines: np.ndarray, address: np.ndarray) -> np.ndarray:
+        # grows memory to cover the addresses, machines with invalid addresses fail
+        valid = (address >= 0) & (address < MAX_MEMORY)
+        self.failed[machines[~valid]] = True
+        if valid.any():
+            needed = int(address[valid].max()) + 1
+            size = self.memory.shape[1]
+            if needed > size:
+                grown = np.zeros((self.memory.shape[0], max(needed, 2 * size)), dtype=np.int64)
+                grown[:, :size] = self.memory
+                self.memory = grown
+        return valid
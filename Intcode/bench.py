@@ -0,0 +1,327 @@
+import argparse
+import json
+import multiprocessing
+import os.path
+import sys
+from itertools import permutations
+from statistics import median
+from timeit import default_timer as timer
+from typing import Any, Callable, NamedTuple
+
+from Intcode import Computer, Program, Status, load_program
+from closure import ClosureComputer
+from jit import JitComputer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+
+ENGINES: dict[str, type[Computer]] = {
+    "Computer": Computer,
+    "ClosureComputer": ClosureComputer,
+    "JitComputer": JitComputer,
+}
+
+# sizes of the synthetic workloads
+RECURSION_DEPTH = 50_000
+MEMORY_CELLS = 100_000
+IO_VALUES = 100_000
+
+type Run = Callable[[type[Computer], Program | memoryview], int]  # returns the number of executed instructions
+
+
+class Workload(NamedTuple):
+    name: str
+    program: Callable[[], Program | memoryview | None]  # None if the input is missing
+    run: Run
+
+
+def assemble(items: list[int | str]) -> Program:
+    # "label:" marks the next address, any other string is replaced by the address of its label
+    labels: dict[str, int] = {}
+    code: list[int | str] = []
+    for item in items:
+        if isinstance(item, str) and item.endswith(":"):
+            labels[item[:-1]] = len(code)
+        else:
+            code.append(item)
+    return [labels[item] if isinstance(item, str) else item for item in code]
+
+
+def day_input(day: str) -> Callable[[], Program | memoryview | None]:
+    def load() -> Program | memoryview | None:
+        input_path = os.path.join(dir_path, "..", day, "input.txt")
+        if not os.path.exists(input_path):
+            return None
+        return load_program(input_path)
+    return load
+
+
+def diagnostic(engine: type[Computer], program: Program | memoryview) -> int:
+    # day05, both parts
+    steps = 0
+    for system in (1, 5):
+        computer = engine(program, [system])
+        computer.run()
+        steps += computer.steps
+    return steps
+
+
+def amplifiers(engine: type[Computer], program: Program | memoryview) -> int:
+    # day07, all permutations of both parts, the feedback loop round robin with one output per turn
+    amplifier = engine(program, [])
+    steps = 0
+    for phases in permutations(range(5)):
+        signal = 0
+        for phase in phases:
+            computer = amplifier.fork()
+            computer.input_values.extend((phase, signal))
+            computer.run()
+            signal = computer.output_values[-1]
+            steps += computer.steps
+    for phases in permutations(range(5, 10)):
+        computers = [amplifier.fork() for _ in phases]
+        for computer, phase in zip(computers, phases):
+            computer.add_input(phase)
+        signal = 0
+        while not computers[-1].terminated:
+            for computer in computers:
+                computer.add_input(signal)
+                computer.run_until(1)
+                if computer.output_values:
+                    signal = computer.take_outputs()[-1]
+        steps += sum(computer.steps for computer in computers)
+    return steps
+
+
+def boost(engine: type[Computer], program: Program | memoryview) -> int:
+    # day09 part 2
+    computer = engine(program, [2])
+    computer.run()
+    return computer.steps
+
+
+def hull_painter(engine: type[Computer], program: Program | memoryview) -> int:
+    # day11 part 1
+    computer = engine(program, [])
+    pos, d = 0j, -1j
+    white: set[complex] = set()
+    while not computer.terminated:
+        computer.add_input(1 if pos in white else 0)
+        computer.run_until(2)
+        if len(computer.output_values) < 2:
+            break
+        color, turn = computer.take_outputs()
+        if color:
+            white.add(pos)
+        else:
+            white.discard(pos)
+        d *= 1j if turn else -1j
+        pos += d
+    return computer.steps
+
+
+def breakout(engine: type[Computer], program: Program | memoryview) -> int:
+    # day13 part 2, the paddle follows the ball
+    program = list(program)
+    program[0] = 2
+    computer = engine(program, [])
+    ball = paddle = 0
+    while computer.run_until() is not Status.HALTED:
+        outputs = computer.take_outputs()
+        for i in range(0, len(outputs) - 2, 3):
+            if outputs[i+2] == 3:
+                paddle = outputs[i]
+            elif outputs[i+2] == 4:
+                ball = outputs[i]
+        computer.add_input((ball > paddle) - (ball < paddle))
+    return computer.steps
+
+
+def recursion_program() -> Program:
+    # sum(n) = n + sum(n-1) with one stack frame per level: [rb] return address, [rb+1] n, [rb+2] result
+    return assemble([
+        109, "stack", 203, 1, 21101, "main", 0, 0, 1105, 1, "sum",
+        "main:", 204, 2, 99,
+        "sum:", 1206, 1, "base",
+        21201, 1, -1, 4, 21101, "back", 0, 3, 109, 3, 1105, 1, "sum",
+        "back:", 109, -3, 22201, 1, 5, 2, 2105, 1, 0,
+        "base:", 21101, 0, 0, 2, 2105, 1, 0,
+        "stack:",
+    ])
+
+
+def recursion(engine: type[Computer], program: Program | memoryview) -> int:
+    computer = engine(program, [RECURSION_DEPTH])
+    computer.run()
+    if computer.output_values != [RECURSION_DEPTH * (RECURSION_DEPTH+1) // 2]:
+        raise ValueError(f"Wrong result {computer.output_values}.")
+    return computer.steps
+
+
+def memory_program() -> Program:
+    # writes 0..n-1 to the cells after the program, then sums them up again backwards
+    return assemble([
+        3, "n", 109, "cells",
+        "fill:", 21001, "i", 0, 0, 109, 1, 1001, "i", 1, "i", 8, "i", "n", "t", 1006, "t", "fill",
+        "sum:", 109, -1, 2001, "s", 0, "s", 1001, "i", -1, "i", 1005, "i", "sum",
+        4, "s", 99,
+        "i:", 0, "n:", 0, "t:", 0, "s:", 0,
+        "cells:",
+    ])
+
+
+def large_memory(engine: type[Computer], program: Program | memoryview) -> int:
+    computer = engine(program, [MEMORY_CELLS])
+    computer.run()
+    if computer.output_values != [MEMORY_CELLS * (MEMORY_CELLS-1) // 2]:
+        raise ValueError(f"Wrong result {computer.output_values}.")
+    return computer.steps
+
+
+def io_program() -> Program:
+    # echoes every input plus one until it reads -1
+    return assemble([
+        "loop:", 3, "v", 1008, "v", -1, "t", 1005, "t", "end",
+        1001, "v", 1, "v", 4, "v", 1105, 1, "loop",
+        "end:", 99,
+        "v:", 0, "t:", 0,
+    ])
+
+
+def io_heavy(engine: type[Computer], program: Program | memoryview) -> int:
+    computer = engine(program, [])
+    total = 0
+    for start in range(0, IO_VALUES, 1000):
+        computer.input_values.extend(range(start, min(start + 1000, IO_VALUES)))
+        computer.run_until()
+        total += sum(computer.take_outputs())
+    computer.add_input(-1)
+    computer.run_until()
+    if total != IO_VALUES * (IO_VALUES+1) // 2:
+        raise ValueError(f"Wrong result {total}.")
+    return computer.steps
+
+
+WORKLOADS = [
+    Workload("day05 diagnostic", day_input("day05"), diagnostic),
+    Workload("day07 amplifiers", day_input("day07"), amplifiers),
+    Workload("day09 boost", day_input("day09"), boost),
+    Workload("day11 hull painter", day_input("day11"), hull_painter),
+    Workload("day13 breakout", day_input("day13"), breakout),
+    Workload("deep recursion", recursion_program, recursion),
+    Workload("large memory", memory_program, large_memory),
+    Workload("io heavy", io_program, io_heavy),
+]
+
+
+def peak_rss() -> float | None:
+    # peak resident set size of the process so far in MiB, see isolated()
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 2**10  # bytes on macOS, KiB elsewhere
+
+
+def measure(workload: Workload, program: Program | memoryview, engine: type[Computer], warmup: int,
+            repeat: int) -> dict[str, Any]:
+    for _ in range(warmup):
+        workload.run(engine, program)
+    times = []
+    for _ in range(repeat):
+        s = timer()
+        steps = workload.run(engine, program)
+        times.append(timer() - s)
+    return {
+        "instructions": steps,
+        "wall_best": min(times),
+        "wall_median": median(times),
+        "instructions_per_second": steps / min(times),
+        "peak_rss_mib": peak_rss(),
+    }
+
+
+def isolated(workload: Workload, program: Program | memoryview, engine: type[Computer], warmup: int,
+             repeat: int) -> dict[str, Any]:
+    # measure() in a forked child, so the peak RSS is the workload's own and not the highest of all before it
+    if resource is None or "fork" not in multiprocessing.get_all_start_methods():
+        return measure(workload, program, engine, warmup, repeat)
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    child = context.Process(target=lambda: sender.send(measure(workload, program, engine, warmup, repeat)))
+    child.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        child.join()
+        raise ValueError(f"{workload.name} failed in its benchmark process (exit code {child.exitcode}).")
+    child.join()
+    return result
+
+
+def selected(name: str, patterns: list[str]) -> bool:
+    # the full workload name or the start of one of its words, "io" picks "io heavy" but not "deep recursion"
+    return any(name == pattern or any(word.startswith(pattern) for word in name.split()) for pattern in patterns)
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    # workloads whose instructions/sec dropped by more than `tolerance` compared to the baseline
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["instructions_per_second"] / baseline[name]["instructions_per_second"]
+        result["baseline_ratio"] = ratio
+        if ratio < 1 - tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Intcode engines.")
+    parser.add_argument("--engine", choices=ENGINES, default="Computer")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="run the workloads with one of these names or word prefixes")
+    parser.add_argument("--save", help="store the results as baseline JSON")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed drop of instructions/sec")
+    args = parser.parse_args()
+
+    engine = ENGINES[args.engine]
+    results: dict[str, Any] = {}
+    print(f"{'workload':<20} {'instructions':>12} {'best s':>8} {'median s':>8} {'Minstr/s':>8} {'RSS MiB':>8}")
+    for workload in WORKLOADS:
+        if args.only and not selected(workload.name, args.only):
+            continue
+        program = workload.program()
+        if program is None:
+            print(f"{workload.name:<20} skipped, no input.txt")
+            continue
+        result = results[workload.name] = isolated(workload, program, engine, args.warmup, args.repeat)
+        rss = "-" if result["peak_rss_mib"] is None else f"{result['peak_rss_mib']:.1f}"
+        print(f"{workload.name:<20} {result['instructions']:>12} {result['wall_best']:>8.3f} "
+              f"{result['wall_median']:>8.3f} {result['instructions_per_second'] / 1e6:>8.2f} {rss:>8}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"engine": args.engine, "results": results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for name, result in results.items():
+            if "baseline_ratio" in result:
+                print(f"{name:<20} {result['baseline_ratio']:.2f}x baseline")
+        if regressions:
+            print("Regressions:", ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
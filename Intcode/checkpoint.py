@@ -0,0 +1,120 @@
+import os
+import pickle
+import struct
+import zlib
+from array import array
+from typing import Any
+
+from Intcode import Computer, Memory, Status
+
+# instructions between two checkpoints of Checkpoint.run
+INTERVAL = 5_000_000
+# every that many records the file is rewritten as a single full record, so it does not grow forever
+FULL_EVERY = 64
+
+# payload length, crc32 of the payload
+RECORD = struct.Struct("<QI")
+
+
+class Checkpoint:
+    """Append-only checkpoint file of a Computer.
+
+    The first record written for a machine's memory holds its whole state, every later one only the registers,
+    the pending input and output and the memory pages written since the record before, which Memory
+    tracks in the slow path of its writes. Records are compressed and carry a checksum: a record that was
+    cut off by a crash is ignored (and dropped from the file) on restore.
+    """
+
+    def __init__(self, path: str, full_every: int = FULL_EVERY) -> None:
+        self.path = path
+        self.full_every = full_every
+        # the memory the file is up to date with, only its changes can be appended; a machine that was
+        # loaded, resumed or restored since has a different one
+        self.memory: Memory | None = None
+        self.records = 0
+
+    def save(self, computer: Computer) -> None:
+        memory = computer.memory
+        full = memory is not self.memory or self.records >= self.full_every
+        dirty = memory.take_dirty()
+        pages = {}
+        for index in (memory.pages if full else dirty):
+            page = memory.pages[index]
+            # shared pages of a mapped program cannot be pickled
+            pages[index] = array("q", page) if isinstance(page, memoryview) else page
+        record = {
+            "full": full,
+            "pointer": computer.pointer,
+            "relative_base": computer.relative_base,
+            "terminated": computer.terminated,
+            "input_values": list(computer.input_values),
+            "output_values": list(computer.output_values),
+            "input_default": computer.input_default,
+            "steps": computer.steps,
+            "pages": pages,
+        }
+        payload = zlib.compress(pickle.dumps(record, pickle.HIGHEST_PROTOCOL), 1)
+        data = RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+
+        if full:  # start over, atomically
+            with open(self.path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(self.path + ".tmp", self.path)
+            self.records = 1
+        else:
+            with open(self.path, "ab") as f:
+                f.write(data)
+            self.records += 1
+        self.memory = memory
+
+    def restore(self, cls: type[Computer] = Computer) -> Computer | None:
+        # the machine as of the last complete record, None without checkpoint
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            data = f.read()
+
+        state: dict[str, Any] | None = None
+        offset = records = 0
+        while offset + RECORD.size <= len(data):
+            length, crc = RECORD.unpack_from(data, offset)
+            payload = data[offset+RECORD.size:offset+RECORD.size+length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break  # cut off while writing
+            record = pickle.loads(zlib.decompress(payload))
+            if record["full"] or state is None:
+                state = record
+            else:
+                state = record | {"pages": state["pages"] | record["pages"]}
+            offset += RECORD.size + length
+            records += 1
+        if state is None:
+            return None
+        if offset < len(data):  # later records would end up behind the broken one
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+        computer = cls.__new__(cls)
+        computer.load([], state["input_values"])
+        memory = computer.memory = Memory()
+        memory.pages = state["pages"]
+        memory.owned = set(memory.pages)
+        computer.pointer = state["pointer"]
+        computer.relative_base = state["relative_base"]
+        computer.terminated = state["terminated"]
+        computer.output_values = state["output_values"]
+        computer.input_default = state["input_default"]
+        computer.steps = state["steps"]
+
+        memory.take_dirty()  # the file is up to date with the restored machine
+        self.memory = memory
+        self.records = records
+        return computer
+
+    def run(self, computer: Computer, interval: int = INTERVAL) -> Status:
+        # run_until() with a checkpoint every `interval` instructions and one when it stops
+        while True:
+            status = computer.run_until(max_steps=interval)
+            self.save(computer)
+            if status is not Status.PAUSED:
+                return status
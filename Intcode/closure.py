@@ -0,0 +1,167 @@
+from typing import Callable
+
+from Intcode import Computer, Program, Address, Parameter, ParameterMode, Value, Status, UNLIMITED
+
+type Reader = Callable[[], Value]
+type Step = Callable[[], Address]  # executes one instruction and returns the next pointer
+
+
+class ClosureComputer(Computer):
+    """Computer that compiles each instruction into a closure for its exact opcode and parameter modes.
+
+    Same interface as Computer, only `run_until` executes a loop over the compiled closures.
+    """
+    __slots__ = ["compiled", "covered"]
+
+    def load(self, program: Program | memoryview, input_values: list[int] = []) -> None:
+        super().load(program, input_values)
+        # start address: (opcode, step)
+        self.compiled: dict[Address, tuple[int, Step]] = {}
+        # addresses read by compiled instructions, writes to them drop the closures
+        self.covered: set[Address] = set()
+
+    def run_until(self, outputs: int | None = None, max_steps: int | None = None) -> Status:
+        if self.profiler is not None:  # profiles always run in the interpreter
+            return self.profiler.run_until(self, outputs, max_steps)
+        compiled = self.compiled
+        pointer = self.pointer
+        produced = 0
+        start = budget = UNLIMITED if max_steps is None else max_steps
+        try:
+            while not self.terminated:
+                if budget <= 0:
+                    return Status.PAUSED
+                entry = compiled.get(pointer)
+                if entry is None:
+                    entry = self.compile(pointer)
+                opcode, step = entry
+                if opcode == 3 and not self.input_values and self.input_default is None:
+                    return Status.NEEDS_INPUT
+                budget -= 1
+                pointer = step()
+                if opcode == 4 and outputs is not None:
+                    produced += 1
+                    if produced == outputs:
+                        return Status.OUTPUT_READY
+        finally:
+            self.pointer = pointer
+            self.steps += start - budget
+        return Status.HALTED
+
+    def compile(self, address: Address) -> tuple[int, Step]:
+        opcode, _, modes = self.decode(address)
+        memory = self.memory
+        params = [memory[address+i] for i in range(1, len(modes)+1)]
+        nxt = address + len(modes) + 1
+        match opcode:
+            case 1 | 2 | 7 | 8:
+                step = self.compile_binary(opcode, params, modes, nxt)
+            case 3:
+                step = self.compile_input(params[0], modes[0], nxt)
+            case 4:
+                x = self.reader(params[0], modes[0])
+
+                def step() -> Address:
+                    self.output_values.append(x())
+                    return nxt
+            case 5 | 6:
+                x, y = self.reader(params[0], modes[0]), self.reader(params[1], modes[1])
+                if opcode == 5:
+                    def step() -> Address:
+                        return y() if x() != 0 else nxt
+                else:
+                    def step() -> Address:
+                        return y() if x() == 0 else nxt
+            case 9:
+                x = self.reader(params[0], modes[0])
+
+                def step() -> Address:
+                    self.relative_base += x()
+                    return nxt
+            case 99:
+                def step() -> Address:
+                    self.terminated = True
+                    return nxt
+            case _:
+                raise ValueError(f"Invalid opcode {opcode}")
+
+        self.covered.update(range(address, nxt))
+        entry = self.compiled[address] = (opcode, step)
+        return entry
+
+    def compile_binary(self, opcode: int, params: list[Parameter], modes: tuple[ParameterMode, ...],
+                       nxt: Address) -> Step:
+        x, y = self.reader(params[0], modes[0]), self.reader(params[1], modes[1])
+        z, z_mode = params[2], modes[2]
+        store = self.__setitem__
+
+        match opcode, z_mode:
+            case 1, 0:
+                def step() -> Address:
+                    store(z, x() + y())
+                    return nxt
+            case 2, 0:
+                def step() -> Address:
+                    store(z, x() * y())
+                    return nxt
+            case 7, 0:
+                def step() -> Address:
+                    store(z, 1 if x() < y() else 0)
+                    return nxt
+            case 8, 0:
+                def step() -> Address:
+                    store(z, 1 if x() == y() else 0)
+                    return nxt
+            case 1, 2:
+                def step() -> Address:
+                    store(self.relative_base + z, x() + y())
+                    return nxt
+            case 2, 2:
+                def step() -> Address:
+                    store(self.relative_base + z, x() * y())
+                    return nxt
+            case 7, 2:
+                def step() -> Address:
+                    store(self.relative_base + z, 1 if x() < y() else 0)
+                    return nxt
+            case 8, 2:
+                def step() -> Address:
+                    store(self.relative_base + z, 1 if x() == y() else 0)
+                    return nxt
+            case _:
+                raise ValueError(f"Invalid parameter mode {z_mode}.")
+        return step
+
+    def compile_input(self, z: Parameter, z_mode: ParameterMode, nxt: Address) -> Step:
+        if z_mode not in (0, 2):
+            raise ValueError(f"Invalid parameter mode {z_mode}.")
+
+        def step() -> Address:
+            if len(self.input_values) > 0:
+                value = self.input_values.popleft()
+            elif self.input_default is not None:
+                value = self.input_default
+            else:
+                raise ValueError("No value provided for input instruction")
+            self[z if z_mode == 0 else self.relative_base + z] = value
+            return nxt
+        return step
+
+    def reader(self, parameter: Parameter, mode: ParameterMode) -> Reader:
+        memory = self.memory
+        match mode:
+            case 0:  # position mode
+                return lambda: memory[parameter]
+            case 1:  # immediate mode
+                return lambda: parameter
+            case 2:  # relative mode
+                return lambda: memory[self.relative_base + parameter]
+            case _:
+                raise ValueError(f"Invalid parameter mode {mode}.")
+
+    def __setitem__(self, address: Address, value: Value) -> None:
+        super().__setitem__(address, value)  # also drops the decoded instruction a profiler runs from
+        if address in self.covered:  # self-modifying code
+            # an instruction covering the address starts at most 3 cells before it
+            for start in range(address-3, address+1):
+                self.compiled.pop(start, None)
@@ -0,0 +1,227 @@
+import argparse
+import json
+from typing import Any, NamedTuple
+
+from Intcode import Computer, Program, Address, OpCode, ParameterMode
+
+JUMPS = (5, 6)
+WRITES = (1, 2, 3, 7, 8)  # instructions whose last parameter is written to
+FOLDABLE = {1: lambda x, y: x + y, 2: lambda x, y: x * y,
+            7: lambda x, y: int(x < y), 8: lambda x, y: int(x == y)}
+
+
+class Decoded(NamedTuple):
+    address: Address
+    opcode: OpCode
+    name: str
+    modes: tuple[ParameterMode, ...]
+    params: tuple[int, ...]
+
+    @property
+    def end(self) -> Address:
+        return self.address + len(self.params) + 1
+
+    def operand(self, i: int) -> str:
+        parameter, mode = self.params[i], self.modes[i]
+        return {0: f"[{parameter}]", 1: f"#{parameter}", 2: f"[rb{parameter:+}]"}.get(mode, f"?{parameter}")
+
+    def constant(self, i: int) -> int | None:
+        return self.params[i] if self.modes[i] == 1 else None
+
+
+def analyze(program: Program) -> dict[str, Any]:
+    """Static analysis of an Intcode program, starting at address 0.
+
+    Follows direct jumps and, for the common relative base calling convention (store the return address
+    relative to rb, then jump), continues after call sites. Jumps through memory are reported as
+    indirect, the ones through the relative base as returns. Immediate arithmetic is folded, constant
+    conditions prune edges. Everything is returned as plain JSON data.
+
+    never_written lists code ranges that provably keep their contents. rb is not tracked, so a single
+    write relative to it (any dynamic_writes entry) could hit anything and the list is empty. That is the
+    case for every program that keeps a stack, e.g. those of day09, day11 and day13: an empty list means
+    "unknown", not "all of it is written".
+    """
+    computer = Computer(program, [])
+    instructions: dict[Address, Decoded] = {}
+    edges: set[tuple[Address, Address]] = set()
+    calls: list[dict[str, Address]] = []
+    returns: list[Address] = []
+    indirect: list[Address] = []
+    leaders: set[Address] = {0}
+
+    todo = [0]
+    while todo:
+        address = todo.pop()
+        if address in instructions or not 0 <= address < len(program):
+            continue
+        try:
+            opcode, _, modes = computer.decode(address)
+        except ValueError:  # data, or reached through a wrong guess
+            continue
+        params = tuple(program[address+i] if address+i < len(program) else 0 for i in range(1, len(modes)+1))
+        instruction = Decoded(address, opcode, Computer.opcodes[opcode][0], modes, params)
+        instructions[address] = instruction
+
+        successors: list[Address] = []
+        if opcode in JUMPS:
+            cond, target = instruction.constant(0), instruction.constant(1)
+            taken = None if cond is None else (cond != 0) == (opcode == 5)
+            if taken is not False:
+                if target is not None:
+                    successors.append(target)
+                elif modes[1] == 2:
+                    returns.append(address)
+                else:
+                    indirect.append(address)
+            if taken is not True:
+                successors.append(instruction.end)
+            leaders.update(successors)
+            if taken is True and target is not None:
+                call = find_call(instructions, address)
+                if call is not None:
+                    calls.append({"site": address, "callee": target, "return_to": call})
+                    successors.append(call)
+                    leaders.add(call)
+        elif opcode != 99:
+            successors.append(instruction.end)
+
+        for successor in successors:
+            edges.add((address, successor))
+            todo.append(successor)
+
+    code = {cell for instruction in instructions.values() for cell in range(instruction.address, instruction.end)}
+    static_writes: list[dict[str, Address]] = []
+    dynamic_writes: list[Address] = []
+    folded: dict[Address, int] = {}
+    for instruction in instructions.values():
+        if instruction.opcode in FOLDABLE:
+            x, y = instruction.constant(0), instruction.constant(1)
+            if x is not None and y is not None:
+                folded[instruction.address] = FOLDABLE[instruction.opcode](x, y)
+        if instruction.opcode in WRITES:
+            if instruction.modes[-1] == 0:
+                static_writes.append({"site": instruction.address, "target": instruction.params[-1]})
+            else:
+                dynamic_writes.append(instruction.address)
+
+    self_modifying = [write for write in static_writes if write["target"] in code]
+    written = {write["target"] for write in self_modifying}
+
+    return {
+        "length": len(program),
+        "instructions": [{"address": i.address, "opcode": i.opcode, "name": i.name, "modes": list(i.modes),
+                          "params": list(i.params)} for i in sorted(instructions.values())],
+        "blocks": blocks(instructions, leaders),
+        "edges": sorted(edges),
+        "calls": calls,
+        "functions": sorted({call["callee"] for call in calls}),
+        "returns": sorted(returns),
+        "indirect_jumps": sorted(indirect),
+        "folded": sorted(folded.items()),  # [address, value] pairs, JSON objects would turn the keys into strings
+        "self_modifying_writes": self_modifying,
+        "dynamic_writes": sorted(dynamic_writes),
+        # code that provably stays as it is, see the docstring for why relative base writes empty it
+        "never_written": [] if dynamic_writes else ranges(code - written),
+    }
+
+
+def find_call(instructions: dict[Address, Decoded], jump: Address) -> Address | None:
+    # a call stores the address right after the jump as a constant relative to rb before jumping
+    after = instructions[jump].end
+    for address in range(jump - 16, jump):
+        instruction = instructions.get(address)
+        if instruction is not None and instruction.opcode in (1, 2) and instruction.modes[2] == 2:
+            x, y = instruction.constant(0), instruction.constant(1)
+            if x is not None and y is not None and FOLDABLE[instruction.opcode](x, y) == after:
+                return after
+    return None
+
+
+def blocks(instructions: dict[Address, Decoded], leaders: set[Address]) -> list[dict[str, Address]]:
+    result = []
+    start: Address | None = None
+    end: Address = 0  # end of the previous instruction
+    for address in sorted(instructions):
+        instruction = instructions[address]
+        if start is None or address in leaders or address != end:
+            if start is not None:
+                result.append({"start": start, "end": end})
+            start = address
+        end = instruction.end
+        if instruction.opcode in JUMPS or instruction.opcode == 99:
+            result.append({"start": start, "end": end})
+            start = None
+    if start is not None:
+        result.append({"start": start, "end": end})
+    return result
+
+
+def ranges(addresses: set[Address]) -> list[tuple[Address, Address]]:
+    # [start, end) ranges covering the addresses
+    result: list[tuple[Address, Address]] = []
+    for address in sorted(addresses):
+        if result and result[-1][1] == address:
+            result[-1] = (result[-1][0], address + 1)
+        else:
+            result.append((address, address + 1))
+    return result
+
+
+def disassemble(program: Program, analysis: dict[str, Any] | None = None) -> str:
+    analysis = analysis or analyze(program)
+    instructions = {i["address"]: Decoded(i["address"], i["opcode"], i["name"], tuple(i["modes"]), tuple(i["params"]))
+                    for i in analysis["instructions"]}
+    leaders = {block["start"] for block in analysis["blocks"]}
+    functions = set(analysis["functions"])
+    returns = set(analysis["returns"])
+    folded = dict(map(tuple, analysis["folded"]))
+    modified = {write["target"] for write in analysis["self_modifying_writes"]}
+    modifying = {write["site"]: write["target"] for write in analysis["self_modifying_writes"]}
+
+    lines = []
+    address = 0
+    while address < len(program):
+        instruction = instructions.get(address)
+        if instruction is None:
+            lines.append(f"{address:6}: {program[address]:<12} data")
+            address += 1
+            continue
+        if address in functions:
+            lines.append(f"\nfn_{address}:")
+        elif address in leaders:
+            lines.append(f"L{address}:")
+
+        operands = ", ".join(instruction.operand(i) for i in range(len(instruction.params)))
+        notes = []
+        if address in folded:
+            notes.append(f"= {folded[address]}")
+        if address in returns:
+            notes.append("return")
+        if address in modifying:
+            notes.append(f"modifies code at {modifying[address]}")
+        if any(cell in modified for cell in range(address, instruction.end)):
+            notes.append("self-modified")
+        note = f"  ; {', '.join(notes)}" if notes else ""
+        lines.append(f"{address:6}: {program[address]:<12} {instruction.name} {operands}{note}".rstrip())
+        address = instruction.end
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Disassemble and analyze an Intcode program.")
+    parser.add_argument("path", help="comma separated program, e.g. dayXX/input.txt")
+    parser.add_argument("--json", action="store_true", help="print the analysis as JSON")
+    args = parser.parse_args()
+
+    with open(args.path) as f:
+        program = list(map(int, f.read().split(",")))
+    analysis = analyze(program)
+    if args.json:
+        print(json.dumps(analysis, indent=2))
+    else:
+        print(disassemble(program, analysis))
+
+
+if __name__ == "__main__":
+    main()
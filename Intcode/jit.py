@@ -0,0 +1,175 @@
+import operator
+from typing import Any, Callable
+
+from Intcode import Computer, Program, Address, Value, Parameter, ParameterMode, Status, PAGE_BITS, PAGE_MASK, UNLIMITED
+
+type Block = Callable[[int], tuple[Address, int, int]]  # rb -> (next pointer, rb, executed instructions)
+
+# interpreted visits of an address before a block starting there gets compiled
+HOT_THRESHOLD = 8
+MAX_BLOCK_LENGTH = 64
+# blocks invalidated more often than this are left to the interpreter
+MAX_RECOMPILES = 4
+
+FOLD: dict[int, Callable[[int, int], int]] = {1: operator.add, 2: operator.mul, 7: operator.lt, 8: operator.eq}
+
+
+class JitComputer(Computer):
+    """Tiered Computer that compiles hot basic blocks to Python bytecode.
+
+    Cold code runs in the Computer interpreter. Once an address got visited HOT_THRESHOLD times, the
+    straight-line block starting there is translated to Python source with parameter modes resolved and
+    immediate arithmetic folded, passed through `compile()` and from then on executed in a single call.
+    Blocks end at jumps and before input, output and terminate instructions.
+    A write into a compiled block drops the block, so self-modifying programs keep working.
+    """
+    __slots__ = ["blocks", "extents", "covered", "hits", "recompiles"]
+
+    def load(self, program: Program | memoryview, input_values: list[int] = []) -> None:
+        super().load(program, input_values)
+        self.blocks: dict[Address, Block] = {}
+        # start address: end address (exclusive) of a compiled block
+        self.extents: dict[Address, Address] = {}
+        self.covered: set[Address] = set()
+        self.hits: dict[Address, int] = {}
+        self.recompiles: dict[Address, int] = {}
+
+    def run_until(self, outputs: int | None = None, max_steps: int | None = None) -> Status:
+        if self.profiler is not None:  # profiles always run in the interpreter
+            return self.profiler.run_until(self, outputs, max_steps)
+        memory = self.memory
+        decoded = self.decoded
+        blocks = self.blocks
+        hits = self.hits
+        produced = 0
+        start = budget = UNLIMITED if max_steps is None else max_steps
+        try:
+            while not self.terminated:
+                if budget <= 0:
+                    return Status.PAUSED
+                pointer = self.pointer
+                block = blocks.get(pointer)
+                if block is not None:
+                    self.pointer, self.relative_base, executed = block(self.relative_base)
+                    budget -= executed
+                    continue
+
+                count = hits[pointer] = hits.get(pointer, 0) + 1
+                if count == HOT_THRESHOLD and self.compile(pointer):
+                    continue
+
+                instruction = decoded.get(pointer)
+                if instruction is None:
+                    instruction = decoded[pointer] = self.decode(pointer)
+                opcode, execute, modes = instruction
+                if opcode == 3 and not self.input_values and self.input_default is None:
+                    return Status.NEEDS_INPUT
+                budget -= 1
+                execute(self, *[(memory[pointer+i], mode) for i, mode in enumerate(modes, 1)])
+                if opcode == 4 and outputs is not None:
+                    produced += 1
+                    if produced == outputs:
+                        return Status.OUTPUT_READY
+        finally:
+            self.steps += start - budget
+        return Status.HALTED
+
+    def compile(self, start: Address) -> bool:
+        if self.recompiles.get(start, 0) > MAX_RECOMPILES:
+            return False
+        lines, end, _ = self.translate(start)
+        if not lines:
+            return False
+
+        source = "def block(rb):\n" + "".join(f"    {line}\n" for line in lines)
+        namespace: dict[str, Any] = {"rd": self.memory.__getitem__, "st": self.store, "pages": self.memory.pages}
+        exec(compile(source, f"<intcode block {start}>", "exec"), namespace)
+        self.blocks[start] = namespace["block"]
+        self.extents[start] = end
+        self.covered.update(range(start, end))
+        return True
+
+    def translate(self, start: Address) -> tuple[list[str], Address, int]:
+        # returns the source lines, the end address and the number of instructions
+        memory = self.memory
+        lines: list[str] = []
+        pointer = start
+        for length in range(MAX_BLOCK_LENGTH):
+            try:
+                opcode, _, modes = self.decode(pointer)
+            except ValueError:
+                break
+            if opcode in (3, 4, 99) or (opcode in (1, 2, 7, 8) and modes[2] == 1):
+                break  # left to the interpreter
+            params = [memory[pointer+i] for i in range(1, len(modes)+1)]
+            nxt = pointer + len(modes) + 1
+            args = [self.operand(p, m) for p, m in zip(params, modes)]
+
+            match opcode:
+                case 1 | 2 | 7 | 8:
+                    x, y = args[0], args[1]
+                    if isinstance(x, int) and isinstance(y, int):  # constant folding
+                        value = str(int(FOLD[opcode](x, y)))
+                    elif opcode == 1:
+                        value = f"{x} + {y}"
+                    elif opcode == 2:
+                        value = f"{x} * {y}"
+                    else:
+                        value = f"1 if {x} {'<' if opcode == 7 else '=='} {y} else 0"
+                    destination = str(params[2]) if modes[2] == 0 else f"rb + {params[2]}"
+                    # a write into compiled code ends the block right away
+                    lines.append(f"if st({destination}, {value}): return {nxt}, rb, {length + 1}")
+                case 5 | 6:
+                    cond, jump_to = args
+                    compare = "!=" if opcode == 5 else "=="
+                    if isinstance(cond, int):
+                        if (cond != 0) == (opcode == 5):
+                            lines.append(f"return {jump_to}, rb, {length + 1}")
+                            return lines, nxt, length + 1
+                        pointer = nxt  # never jumps
+                        continue
+                    lines.append(f"return ({jump_to} if {cond} {compare} 0 else {nxt}), rb, {length + 1}")
+                    return lines, nxt, length + 1
+                case 9:
+                    lines.append(f"rb += {args[0]}")
+            pointer = nxt
+        else:
+            length = MAX_BLOCK_LENGTH
+
+        if lines:
+            lines.append(f"return {pointer}, rb, {length}")
+        return lines, pointer, length
+
+    def operand(self, parameter: Parameter, mode: ParameterMode) -> int | str:
+        # constants stay ints, everything else becomes a Python expression
+        match mode:
+            case 0:  # position mode
+                index = parameter >> PAGE_BITS
+                if index in self.memory.pages:  # pages are never dropped, only replaced
+                    return f"pages[{index}][{parameter & PAGE_MASK}]"
+                return f"rd({parameter})"
+            case 1:  # immediate mode
+                return parameter
+            case 2:  # relative mode
+                return f"rd(rb + {parameter})"
+            case _:
+                raise ValueError(f"Invalid parameter mode {mode}.")
+
+    def store(self, address: Address, value: Value) -> bool:
+        # returns whether compiled code got invalidated
+        self.memory[address] = value
+        if address in self.decoded:
+            del self.decoded[address]
+        if address not in self.covered:
+            return False
+        for start, end in list(self.extents.items()):
+            if start <= address < end:
+                del self.blocks[start]
+                del self.extents[start]
+                self.hits[start] = 0
+                self.recompiles[start] = self.recompiles.get(start, 0) + 1
+        self.covered = {address for start, end in self.extents.items() for address in range(start, end)}
+        return True
+
+    def __setitem__(self, address: Address, value: Value) -> None:
+        self.store(address, value)
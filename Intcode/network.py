@@ -0,0 +1,85 @@
+from collections import defaultdict, deque
+from collections.abc import Hashable
+
+from Intcode import Computer, Status
+
+# instructions a machine may run before the next runnable machine gets its turn
+TIME_SLICE = 10_000
+
+type Node = Hashable
+
+
+class Network:
+    """Computers connected by buffered channels, for chains, rings or any other topology.
+
+    The outputs of a machine are appended to the input queues of all machines it is connected to, a machine
+    without connections keeps its outputs. The scheduler only keeps runnable machines in its ready queue:
+    a machine waiting for input leaves it and comes back once input arrives, so picking the next machine
+    costs O(1) no matter how many are blocked.
+    """
+
+    def __init__(self, time_slice: int = TIME_SLICE) -> None:
+        self.computers: dict[Node, Computer] = {}
+        self.routes: defaultdict[Node, list[Node]] = defaultdict(list)
+        self.ready: deque[Node] = deque()
+        self.queued: set[Node] = set()
+        self.time_slice = time_slice
+
+    def add(self, node: Node, computer: Computer) -> None:
+        self.computers[node] = computer
+        self.wake(node)
+
+    def connect(self, source: Node, target: Node) -> None:
+        self.routes[source].append(target)
+
+    def send(self, node: Node, *values: int) -> None:
+        # input from outside the network
+        self.computers[node].input_values.extend(values)
+        self.wake(node)
+
+    def wake(self, node: Node) -> None:
+        if node not in self.queued and not self.computers[node].terminated:
+            self.queued.add(node)
+            self.ready.append(node)
+
+    def run(self, max_steps: int | None = None) -> Status:
+        """Runs until every machine halted (HALTED), every remaining machine waits for input that nobody
+        will send (NEEDS_INPUT, a deadlock unless more input gets sent from outside) or about `max_steps`
+        instructions were executed in total (PAUSED)."""
+        budget = max_steps
+        while self.ready:
+            if budget is not None and budget <= 0:
+                return Status.PAUSED
+            node = self.ready.popleft()
+            self.queued.discard(node)
+            computer = self.computers[node]
+
+            steps = computer.steps
+            status = computer.run_until(max_steps=self.time_slice)
+            if budget is not None:
+                budget -= computer.steps - steps
+
+            targets = self.routes.get(node)
+            if targets and computer.output_values:
+                outputs = computer.take_outputs()
+                for target in targets:
+                    self.computers[target].input_values.extend(outputs)
+                    self.wake(target)
+
+            if status is Status.PAUSED or (status is Status.NEEDS_INPUT and computer.input_values):
+                self.wake(node)
+
+        if all(computer.terminated for computer in self.computers.values()):
+            return Status.HALTED
+        return Status.NEEDS_INPUT
+
+    @property
+    def blocked(self) -> list[Node]:
+        # machines waiting for input
+        return [node for node, computer in self.computers.items()
+                if not computer.terminated and node not in self.queued]
+
+    @property
+    def steps(self) -> dict[Node, int]:
+        # executed instructions per machine
+        return {node: computer.steps for node, computer in self.computers.items()}
@@ -0,0 +1,155 @@
+import json
+from collections import Counter, deque
+from typing import Any
+
+from Intcode import Computer, Status, Address, OpCode, ParameterMode, PAGE_BITS, UNLIMITED
+
+# executed instructions kept in the trace
+TRACE_LENGTH = 64
+# frames deeper than this are folded into the deepest one
+MAX_DEPTH = 256
+
+type Trace = tuple[Address, OpCode, tuple[int, ...]]  # pointer, opcode, parameters
+
+
+class Profiler:
+    """Instruction level profile of a Computer.
+
+    Attach it with `computer.profiler = Profiler()`. While attached, `run_until` executes through the
+    instrumented loop below, which counts instructions per opcode and per mode combination, hot addresses,
+    loop heads (targets of backward jumps) and operand reads and writes per memory page, and keeps the
+    last TRACE_LENGTH instructions. Without a profiler the interpreter only pays a single check per call.
+
+    Call stacks for the collapsed stack export follow the calling convention disasm.find_call recognises:
+    a jump taken right after the address behind it was stored relative to rb starts a frame named after
+    its target, a jump to an address read relative to rb ends it. Stacks are interned as nodes of a tree,
+    so an instruction only counts (node, opcode).
+    """
+
+    def __init__(self, trace_length: int = TRACE_LENGTH) -> None:
+        self.opcodes: Counter[OpCode] = Counter()
+        self.modes: Counter[tuple[OpCode, tuple[ParameterMode, ...]]] = Counter()
+        self.addresses: Counter[Address] = Counter()
+        self.loop_heads: Counter[Address] = Counter()
+        self.reads: Counter[int] = Counter()  # by page
+        self.writes: Counter[int] = Counter()
+        self.trace: deque[Trace] = deque(maxlen=trace_length)
+        # stack node: (parent node, frame name), node 0 is the root frame "main"
+        self.nodes: list[tuple[int, str]] = [(-1, "main")]
+        self.children: dict[tuple[int, str], int] = {}
+        self.stacks: Counter[tuple[int, OpCode]] = Counter()
+        self.stack: list[int] = [0]
+        self.overflow = 0  # calls beyond MAX_DEPTH that opened no frame
+        self.stored: int | None = None  # value of the last write relative to rb
+
+    def run_until(self, computer: Computer, outputs: int | None = None, max_steps: int | None = None) -> Status:
+        memory = computer.memory
+        decoded = computer.decoded
+        produced = 0
+        start = budget = UNLIMITED if max_steps is None else max_steps
+        try:
+            while not computer.terminated:
+                if budget <= 0:
+                    return Status.PAUSED
+                pointer = computer.pointer
+                instruction = decoded.get(pointer)
+                if instruction is None:
+                    instruction = decoded[pointer] = computer.decode(pointer)
+                opcode, execute, modes = instruction
+                if opcode == 3 and not computer.input_values and computer.input_default is None:
+                    return Status.NEEDS_INPUT
+                budget -= 1
+                params = tuple(memory[pointer+i] for i in range(1, len(modes)+1))
+                relative_base = computer.relative_base
+                self.record(pointer, opcode, modes, params, relative_base)
+
+                execute(computer, *zip(params, modes))
+
+                if opcode in (5, 6) and computer.pointer != pointer + 3:
+                    if computer.pointer <= pointer:
+                        self.loop_heads[computer.pointer] += 1
+                    if self.stored == pointer + 3:
+                        self.call(computer.pointer)
+                    elif modes[1] == 2:
+                        self.ret()
+                    self.stored = None
+                elif opcode in (1, 2) and modes[2] == 2:
+                    self.stored = memory[relative_base + params[2]]
+                elif opcode == 4 and outputs is not None:
+                    produced += 1
+                    if produced == outputs:
+                        return Status.OUTPUT_READY
+        finally:
+            computer.steps += start - budget
+        return Status.HALTED
+
+    def call(self, target: Address) -> None:
+        if len(self.stack) > MAX_DEPTH:
+            self.overflow += 1
+            return
+        key = (self.stack[-1], f"fn@{target}")
+        node = self.children.get(key)
+        if node is None:
+            node = self.children[key] = len(self.nodes)
+            self.nodes.append(key)
+        self.stack.append(node)
+
+    def ret(self) -> None:
+        if self.overflow > 0:
+            self.overflow -= 1
+        elif len(self.stack) > 1:
+            self.stack.pop()
+
+    def frames(self, node: int) -> list[str]:
+        names = []
+        while node >= 0:
+            node, name = self.nodes[node]
+            names.append(name)
+        return names[::-1]
+
+    def record(self, pointer: Address, opcode: OpCode, modes: tuple[ParameterMode, ...], params: tuple[int, ...],
+               relative_base: int) -> None:
+        self.opcodes[opcode] += 1
+        self.modes[opcode, modes] += 1
+        self.addresses[pointer] += 1
+        self.trace.append((pointer, opcode, params))
+        self.stacks[self.stack[-1], opcode] += 1
+
+        # the last parameter of these instructions is written to, all others are read
+        writes = 1 if opcode in (1, 2, 3, 7, 8) else 0
+        for i, (parameter, mode) in enumerate(zip(params, modes)):
+            if mode == 1:
+                continue
+            address = parameter if mode == 0 else relative_base + parameter
+            if i >= len(params) - writes:
+                self.writes[address >> PAGE_BITS] += 1
+            else:
+                self.reads[address >> PAGE_BITS] += 1
+
+    def report(self, top: int = 20) -> dict[str, Any]:
+        names = {opcode: name for opcode, (name, _) in Computer.opcodes.items()}
+        return {
+            "instructions": self.opcodes.total(),
+            "opcodes": {names[opcode]: count for opcode, count in self.opcodes.most_common()},
+            "modes": {f"{names[opcode]} {','.join(map(str, modes))}": count
+                      for (opcode, modes), count in self.modes.most_common()},
+            "hot_addresses": dict(self.addresses.most_common(top)),
+            "loop_heads": dict(self.loop_heads.most_common(top)),
+            "memory": {
+                "page_size": 1 << PAGE_BITS,
+                "reads": dict(sorted(self.reads.items())),
+                "writes": dict(sorted(self.writes.items())),
+            },
+            "trace": [{"pointer": pointer, "opcode": names[opcode], "parameters": list(params)}
+                      for pointer, opcode, params in self.trace],
+        }
+
+    def write_json(self, path: str, top: int = 20) -> None:
+        with open(path, "w") as f:
+            json.dump(self.report(top), f, indent=2)
+
+    def write_collapsed(self, path: str) -> None:
+        # one "frame;frame;instruction count" line per stack, the input format of flamegraph tools
+        with open(path, "w") as f:
+            for (node, opcode), count in self.stacks.most_common():
+                f.write(f"{';'.join(self.frames(node))};{Computer.opcodes[opcode][0]} {count}\n")
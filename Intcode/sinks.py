@@ -0,0 +1,71 @@
+from collections import deque
+from typing import Callable, Iterator, Protocol
+
+from Intcode import Computer
+
+type Record = tuple[int, ...]
+
+
+class Sink(Protocol):
+    # what a Computer needs from its output_values: the default list, a deque or one of the sinks below
+    def append(self, value: int, /) -> None: ...
+    def clear(self) -> None: ...
+    def __iter__(self) -> Iterator[int]: ...
+    def __len__(self) -> int: ...
+
+
+class Callback:
+    """Sink that passes every output to `function` right away and keeps nothing."""
+
+    def __init__(self, function: Callable[[int], None]) -> None:
+        self.function = function
+
+    def append(self, value: int, /) -> None:
+        self.function(value)
+
+    def clear(self) -> None:
+        pass
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(())
+
+    def __len__(self) -> int:
+        return 0
+
+
+class Records:
+    """Sink that frames the outputs into records of `arity` values and passes every complete record to
+    `function`, e.g. the (x, y, tile) triples of day13. Only the incomplete record is kept."""
+
+    def __init__(self, arity: int, function: Callable[[Record], None]) -> None:
+        self.arity = arity
+        self.function = function
+        self.partial: list[int] = []
+
+    def append(self, value: int, /) -> None:
+        self.partial.append(value)
+        if len(self.partial) == self.arity:
+            record = tuple(self.partial)
+            self.partial.clear()
+            self.function(record)
+
+    def clear(self) -> None:
+        self.partial.clear()
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.partial)
+
+    def __len__(self) -> int:
+        return len(self.partial)
+
+
+def ring_buffer(size: int) -> deque[int]:
+    # keeps the last `size` outputs
+    return deque(maxlen=size)
+
+
+def attach(computer: Computer, sink: Sink) -> None:
+    # outputs go to `sink` from now on, pending ones are passed on first
+    for value in computer.take_outputs():
+        sink.append(value)
+    computer.output_values = sink  # type: ignore[assignment]
@@ -0,0 +1,81 @@
+from collections.abc import Callable, Iterable
+from itertools import batched
+from multiprocessing import Pool
+from typing import Any
+
+from Intcode import Computer, Program, load_program
+
+type Config = Any
+type Evaluate = Callable[[Program | memoryview, Config], Any]
+
+# set once per worker process by the pool initializer
+_program: Program | memoryview = []
+_evaluate: Evaluate | None = None
+
+
+def last_output(program: Program | memoryview, input_values: list[int]) -> int:
+    # default evaluation: run the program on the configuration as input, keep the last output
+    computer = Computer(program, list(input_values))
+    computer.run()
+    return computer.output_values[-1]
+
+
+class Max:
+    """Reducer that keeps the configuration with the largest result, the earliest one on ties."""
+
+    def __init__(self) -> None:
+        self.best: tuple[Config, Any] | None = None
+
+    def add(self, config: Config, result: Any) -> bool:
+        if self.best is None or result > self.best[1]:
+            self.best = (config, result)
+        return False
+
+
+class FirstMatch:
+    """Reducer that stops the sweep at the earliest configuration whose result satisfies the predicate."""
+
+    def __init__(self, predicate: Callable[[Any], bool]) -> None:
+        self.predicate = predicate
+        self.best: tuple[Config, Any] | None = None
+
+    def add(self, config: Config, result: Any) -> bool:
+        if self.predicate(result):
+            self.best = (config, result)
+            return True
+        return False
+
+
+type Reducer = Max | FirstMatch
+
+
+def sweep(program: Program | str, configs: Iterable[Config], reducer: Reducer, evaluate: Evaluate = last_output,
+          processes: int | None = None, chunksize: int = 64) -> tuple[Config, Any] | None:
+    """Evaluates `evaluate(program, config)` for every configuration on a process pool.
+
+    The program is sent to every worker once, configurations travel in chunks. Results are reduced in
+    the order of `configs`, so the outcome does not depend on scheduling. As soon as the reducer is done
+    the remaining work is cancelled. Given the path of an input.txt instead of a program, every worker
+    maps the binary cache of it (see load_program) rather than receiving a pickled copy.
+    `evaluate` has to be picklable (a module level function) and on platforms that spawn workers the
+    caller needs an `if __name__ == "__main__":` guard.
+    """
+    if isinstance(program, str):
+        load_program(program)  # writes the cache once instead of every worker racing for it
+    with Pool(processes, initializer=_init_worker, initargs=(program, evaluate)) as pool:
+        for chunk, results in pool.imap(_evaluate_chunk, batched(configs, chunksize)):
+            for config, result in zip(chunk, results):
+                if reducer.add(config, result):
+                    return reducer.best  # leaving the with block terminates the workers
+    return reducer.best
+
+
+def _init_worker(program: Program | str, evaluate: Evaluate) -> None:
+    global _program, _evaluate
+    _program = load_program(program) if isinstance(program, str) else program
+    _evaluate = evaluate
+
+
+def _evaluate_chunk(chunk: tuple[Config, ...]) -> tuple[tuple[Config, ...], list[Any]]:
+    assert _evaluate is not None
+    return chunk, [_evaluate(_program, config) for config in chunk]
@@ -0,0 +1,235 @@
+from itertools import product
+from typing import NamedTuple, Sequence
+
+from Intcode import Computer, Program, Address
+
+# instructions run_symbolic executes before it gives up
+MAX_STEPS = 10**6
+
+type Symbol = str
+type Term = int | Affine | Unknown
+
+
+class SymbolicError(ValueError):
+    # the program does something with a symbol that is not affine: branching on it, using it as address
+    # or opcode, multiplying two of them, running out of input or steps; the caller has to fall back to a
+    # concrete search
+    pass
+
+
+class Unknown:
+    # value read through an address that depends on a symbol, fine as long as it is never used
+    def __add__(self, other: Term) -> "Unknown":
+        return self
+
+    __radd__ = __mul__ = __rmul__ = __add__
+
+    def __repr__(self) -> str:
+        return "unknown"
+
+
+UNKNOWN = Unknown()
+
+
+class Affine:
+    """const + sum(coefficient * symbol), the value of a memory cell in terms of the unknowns."""
+    __slots__ = ["const", "coefficients"]
+
+    def __init__(self, const: int = 0, coefficients: dict[Symbol, int] | None = None) -> None:
+        self.const = const
+        self.coefficients = {symbol: c for symbol, c in (coefficients or {}).items() if c != 0}
+
+    @classmethod
+    def symbol(cls, name: Symbol) -> "Affine":
+        return cls(0, {name: 1})
+
+    def __add__(self, other: Term) -> Term:
+        if isinstance(other, Unknown):
+            return other
+        if isinstance(other, int):
+            return term(self.const + other, self.coefficients)
+        coefficients = self.coefficients.copy()
+        for symbol, c in other.coefficients.items():
+            coefficients[symbol] = coefficients.get(symbol, 0) + c
+        return term(self.const + other.const, coefficients)
+
+    __radd__ = __add__
+
+    def __mul__(self, other: Term) -> Term:
+        if isinstance(other, Unknown):
+            return other
+        if not isinstance(other, int):
+            raise SymbolicError(f"Product of {self} and {other} is not affine.")
+        return term(self.const * other, {symbol: c * other for symbol, c in self.coefficients.items()})
+
+    __rmul__ = __mul__
+
+    def evaluate(self, values: dict[Symbol, int]) -> int:
+        return self.const + sum(c * values[symbol] for symbol, c in self.coefficients.items())
+
+    def __repr__(self) -> str:
+        return " + ".join([f"{c}*{symbol}" for symbol, c in self.coefficients.items()] + [str(self.const)])
+
+
+def term(const: int, coefficients: dict[Symbol, int]) -> Term:
+    # plain ints as soon as no symbol is left
+    result = Affine(const, coefficients)
+    return result if result.coefficients else const
+
+
+class SymbolicResult(NamedTuple):
+    memory: dict[Address, Term]
+    output_values: list[Term]
+    steps: int
+
+
+def run_symbolic(program: Program, symbols: dict[Address, Symbol] | None = None,
+                 input_values: Sequence[Term] = (), max_steps: int = MAX_STEPS) -> SymbolicResult:
+    """Runs the program with the cells in `symbols` (and any Affine input) as unknowns.
+
+    Raises SymbolicError as soon as the path or a written address would depend on an unknown, so a
+    result holds for every value of the unknowns. Reads through such an address give UNKNOWN.
+    """
+    memory: dict[Address, Term] = dict(enumerate(program))
+    for cell, name in (symbols or {}).items():
+        memory[cell] = Affine.symbol(name)
+    inputs = list(input_values)[::-1]
+    outputs: list[Term] = []
+    pointer = relative_base = 0
+
+    def concrete(value: Term, what: str) -> int:
+        if not isinstance(value, int):
+            raise SymbolicError(f"{what} at {pointer} depends on {value}.")
+        return value
+
+    def address(i: int, mode: int) -> Address:
+        parameter = concrete(memory.get(pointer+i, 0), "Parameter")
+        match mode:
+            case 0:
+                return parameter
+            case 2:
+                return relative_base + parameter
+            case _:
+                raise ValueError(f"Invalid parameter mode {mode}.")
+
+    def value(i: int, mode: int) -> Term:
+        if mode == 1:
+            return memory.get(pointer+i, 0)
+        if not isinstance(memory.get(pointer+i, 0), int):
+            return UNKNOWN
+        return memory.get(address(i, mode), 0)
+
+    for steps in range(max_steps):
+        word = concrete(memory.get(pointer, 0), "Opcode")
+        opcode = word % 100
+        if opcode not in Computer.opcodes:
+            raise ValueError(f"Invalid opcode {opcode}")
+        modes = [word // 10**(i+1) % 10 for i in range(1, Computer.opcodes[opcode][1]+1)]
+        match opcode:
+            case 1:
+                memory[address(3, modes[2])] = value(1, modes[0]) + value(2, modes[1])
+            case 2:
+                memory[address(3, modes[2])] = value(1, modes[0]) * value(2, modes[1])
+            case 3:
+                if not inputs:
+                    raise SymbolicError("No value provided for input instruction")
+                memory[address(1, modes[0])] = inputs.pop()
+            case 4:
+                outputs.append(value(1, modes[0]))
+            case 5 | 6:
+                cond = concrete(value(1, modes[0]), "Jump condition")
+                if (cond != 0) == (opcode == 5):
+                    pointer = concrete(value(2, modes[1]), "Jump target")
+                    continue
+            case 7:
+                x, y = concrete(value(1, modes[0]), "Comparison"), concrete(value(2, modes[1]), "Comparison")
+                memory[address(3, modes[2])] = 1 if x < y else 0
+            case 8:
+                x, y = concrete(value(1, modes[0]), "Comparison"), concrete(value(2, modes[1]), "Comparison")
+                memory[address(3, modes[2])] = 1 if x == y else 0
+            case 9:
+                relative_base += concrete(value(1, modes[0]), "Relative base offset")
+            case 99:
+                return SymbolicResult(memory, outputs, steps + 1)
+        pointer += len(modes) + 1
+    raise SymbolicError("Max iterations reached.")
+
+
+def solve(expression: Term, target: int, bounds: dict[Symbol, range]) -> dict[Symbol, int] | None:
+    """The first solution of expression == target within `bounds`, in the order a nested loop over the
+    ranges (outermost first) would find it, or None.
+
+    Two unknowns are solved directly as linear Diophantine equation, any further ones are looped over.
+    """
+    if isinstance(expression, Unknown):
+        raise SymbolicError("Expression is unknown.")
+    if isinstance(expression, int):
+        expression = Affine(expression)
+    symbols = list(bounds)
+    if set(expression.coefficients) - set(symbols):
+        raise ValueError(f"No bounds for {set(expression.coefficients) - set(symbols)}.")
+    coefficients = [expression.coefficients.get(symbol, 0) for symbol in symbols]
+    solution = solve_linear(coefficients, target - expression.const, [bounds[symbol] for symbol in symbols])
+    return None if solution is None else dict(zip(symbols, solution))
+
+
+def solve_linear(coefficients: list[int], rest: int, ranges: list[range]) -> tuple[int, ...] | None:
+    # sum(coefficients[i] * x[i]) == rest
+    if any(r.step != 1 for r in ranges):
+        for xs in product(*ranges):
+            if sum(c * x for c, x in zip(coefficients, xs)) == rest:
+                return xs
+        return None
+    if len(ranges) > 2:
+        for x in ranges[0]:
+            solution = solve_linear(coefficients[1:], rest - coefficients[0] * x, ranges[1:])
+            if solution is not None:
+                return (x, *solution)
+        return None
+    if len(ranges) == 0:
+        return () if rest == 0 else None
+    if len(ranges) == 1 or coefficients[1] == 0:
+        a, r = coefficients[0], ranges[0]
+        others = tuple(rng.start for rng in ranges[1:] if len(rng) > 0)
+        if len(others) < len(ranges) - 1:
+            return None
+        if a == 0:
+            return (r.start, *others) if rest == 0 and len(r) > 0 else None
+        return (rest // a, *others) if rest % a == 0 and rest // a in r else None
+    if coefficients[0] == 0:
+        solution = solve_linear(coefficients[1:], rest, ranges[1:])
+        return None if solution is None or len(ranges[0]) == 0 else (ranges[0].start, *solution)
+
+    # a*x + b*y = rest: x = x0 + k*db, y = y0 - k*da
+    a, b = coefficients
+    g, p, q = extended_gcd(a, b)
+    if rest % g != 0:
+        return None
+    x0, y0 = p * (rest // g), q * (rest // g)
+    da, db = a // g, b // g
+    k_min, k_max = k_interval(x0, db, ranges[0])
+    k_lo, k_hi = k_interval(y0, -da, ranges[1])
+    k_min, k_max = max(k_min, k_lo), min(k_max, k_hi)
+    if k_min > k_max:
+        return None
+    k = k_min if db > 0 else k_max  # smallest x
+    return x0 + k * db, y0 - k * da
+
+
+def extended_gcd(a: int, b: int) -> tuple[int, int, int]:
+    # g, p, q with a*p + b*q == g
+    p0, q0, p1, q1 = 1, 0, 0, 1
+    while b != 0:
+        quotient = a // b
+        a, b = b, a - quotient * b
+        p0, p1 = p1, p0 - quotient * p1
+        q0, q1 = q1, q0 - quotient * q1
+    return a, p0, q0
+
+
+def k_interval(start: int, step: int, r: range) -> tuple[int, int]:
+    # all k with start + k*step in r, step != 0
+    lo, hi = r.start - start, r.stop - 1 - start
+    if step < 0:
+        lo, hi, step = -hi, -lo, -step
+    return -(-lo // step), hi // step
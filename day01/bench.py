@@ -0,0 +1,60 @@
+import argparse
+import os.path
+import shutil
+import subprocess
+import tempfile
+from timeit import default_timer as timer
+
+import numpy as np
+
+from day01 import fuel, total_fuel, fuel_stream, parse
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+
+
+def wrap(value: int) -> int:
+    # day01.c sums in a 32 bit int
+    return (value + 2**31) % 2**32 - 2**31
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the NumPy fuel calculator with day01.c.")
+    parser.add_argument("--n", type=int, default=10**7, help="number of random masses")
+    parser.add_argument("--seed", type=int, default=2019)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "input.txt")
+        masses = np.random.default_rng(args.seed).integers(50_000, 150_000, args.n)
+        np.savetxt(input_path, masses, fmt="%d")
+        del masses
+        print(f"{args.n} masses, {os.path.getsize(input_path) / 2**20:.1f} MiB")
+
+        s = timer()
+        with open(input_path, "rb") as f:
+            masses = parse(f.read())
+        expected = fuel(masses), total_fuel(masses)
+        print(f"numpy in memory: {timer() - s:.3f}s")
+        del masses
+
+        s = timer()
+        if fuel_stream(input_path) != expected:
+            raise ValueError("Streaming and in memory results differ.")
+        print(f"numpy streaming: {timer() - s:.3f}s")
+
+        compiler = shutil.which("cc") or shutil.which("gcc") or shutil.which("clang")
+        if compiler is None:
+            print("day01.c: skipped, no C compiler")
+            return
+        binary = os.path.join(tmp, "day01")
+        subprocess.run([compiler, "-O2", "-o", binary, os.path.join(dir_path, "day01.c")], check=True)
+        s = timer()
+        output = subprocess.run([binary], cwd=tmp, capture_output=True, text=True, check=True).stdout
+        print(f"day01.c:         {timer() - s:.3f}s")
+        results = tuple(int(line.split(":")[1]) for line in output.splitlines())
+        if results != tuple(map(wrap, expected)):
+            raise ValueError(f"day01.c printed {results}, expected {expected}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,69 @@
 import os.path
 from timeit import default_timer as timer
+from typing import Iterator
+import numpy as np
+import numpy.typing as npt
 
+type Masses = npt.NDArray[np.int64]
 
-s = timer()
+# bytes read at once in streaming mode
+CHUNK_BYTES = 1 << 24
 
 
-dir_path = os.path.dirname(os.path.realpath(__file__))
-input_path = os.path.join(dir_path, "input.txt")
-with open(input_path) as f:
-    data = f.read().splitlines()
+def parse(data: str | bytes) -> Masses:
+    # one mass per line, parsed in bulk
+    return np.fromstring(data, dtype=np.int64, sep="\n")
 
-p1 = 0
-p2 = 0
 
-for line in data:
-    num = int(line)
-    fuel = num // 3 - 2
-    p1 += fuel
-    while fuel > 0:
-        p2 += fuel
-        fuel = fuel // 3 - 2
+def stream(path: str, chunk_bytes: int = CHUNK_BYTES) -> Iterator[Masses]:
+    # the masses of a file of any size in chunks, a line cut by a chunk border goes to the next chunk
+    rest = b""
+    with open(path, "rb") as f:
+        while block := f.read(chunk_bytes):
+            block = rest + block
+            cut = block.rfind(b"\n") + 1
+            block, rest = block[:cut], block[cut:]
+            if block.strip():
+                yield parse(block)
+    if rest.strip():
+        yield parse(rest)
 
-print("Part 1:", p1)
-print("Part 2:", p2)
 
+def fuel(masses: Masses) -> int:
+    return int((masses // 3 - 2).sum())
 
-e = timer()
-print(f"time: {e-s}")
+
+def total_fuel(masses: Masses) -> int:
+    # fuel for the fuel: the formula is applied to the shrinking set of entries that still need fuel
+    total = 0
+    needed = masses // 3 - 2
+    needed = needed[needed > 0]
+    while needed.size > 0:
+        total += int(needed.sum())
+        needed = needed // 3 - 2
+        needed = needed[needed > 0]
+    return total
+
+
+def fuel_stream(path: str, chunk_bytes: int = CHUNK_BYTES) -> tuple[int, int]:
+    # both parts in constant memory
+    p1 = p2 = 0
+    for masses in stream(path, chunk_bytes):
+        p1 += fuel(masses)
+        p2 += total_fuel(masses)
+    return p1, p2
+
+
+if __name__ == "__main__":
+    s = timer()
+
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    input_path = os.path.join(dir_path, "input.txt")
+    with open(input_path) as f:
+        masses = parse(f.read())
+
+    print("Part 1:", fuel(masses))
+    print("Part 2:", total_fuel(masses))
+
+    e = timer()
+    print(f"time: {e-s}")
@@ -1,9 +1,17 @@
 import os.path
+import sys
 from timeit import default_timer as timer
 from itertools import product
+import numpy as np
 
 type Program = list[int]
 
+dir_path = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.join(dir_path, '..', 'Intcode'))
+from Intcode import load_program  # noqa
+from batch import BatchComputer  # noqa
+from symbolic import run_symbolic, solve, SymbolicError  # noqa
+
 
 def computer(program: Program) -> int | None:
     n = len(program)
@@ -24,27 +32,35 @@ def computer(program: Program) -> int | None:
     return program[0]
 
 
-def part2(program: Program) -> int:
-    for noun, verb in product(range(100), repeat=2):
-        altered = program[:]
-        altered[1] = noun
-        altered[2] = verb
-        if computer(altered) == 19690720:
-            break
-    else:
+def part2(program: Program, size: int = 100) -> int:
+    # one symbolic run: memory[0] ends up affine in noun and verb, which leaves a linear equation
+    try:
+        result = run_symbolic(program, {1: "noun", 2: "verb"})
+        solution = solve(result.memory[0], 19690720, {"noun": range(size), "verb": range(size)})
+    except SymbolicError:
+        return search(program, size)
+    if solution is None:
         raise ValueError("Couldnt find proper noun and verb.")
+    return 100 * solution["noun"] + solution["verb"]
+
+
+def search(program: Program, size: int = 100) -> int:
+    # all candidates run in lockstep, the first hit is the one the brute force loop would find
+    candidates = list(product(range(size), repeat=2))
+    batch = BatchComputer(program, len(candidates))
+    batch.memory[:, 1:3] = candidates
+    batch.run()
+    hits = np.flatnonzero(batch.terminated & (batch.memory[:, 0] == 19690720))
+    if hits.size == 0:
+        raise ValueError("Couldnt find proper noun and verb.")
+    noun, verb = candidates[hits[0]]
     return 100 * noun + verb
 
 
 s = timer()
 
 
-dir_path = os.path.dirname(os.path.realpath(__file__))
-input_path = os.path.join(dir_path, "input.txt")
-with open(input_path) as f:
-    data = f.read()
-
-program = [int(x) for x in data.split(",")]
+program = list(load_program(os.path.join(dir_path, "input.txt")))
 program2 = program[:]
 program[1] = 12
 program[2] = 2
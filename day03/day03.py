@@ -1,38 +1,124 @@
 import os.path
+from bisect import bisect_left, insort
+from collections import defaultdict
 from timeit import default_timer as timer
+from typing import NamedTuple
 
 type Pos = tuple[int, int]  # (y,x) y downwards
 type Dir = tuple[int, int]
 type Steps = int
-type Wire = dict[Pos, Steps]
+type Pair = tuple[int, int]  # wire indices, smaller one first
 
 DIRS: dict[str, Dir] = {"U": (-1, 0), "R": (0, 1), "D": (1, 0), "L": (0, -1)}
 
 
-def create_wire(wire_str: str) -> Wire:
+class Segment(NamedTuple):
+    wire: int
+    fixed: int  # y of a horizontal, x of a vertical segment
+    lo: int  # cells lo..hi along the segment, the cell it starts from belongs to the segment before
+    hi: int
+    start: int  # coordinate along the segment it starts from
+    offset: Steps  # steps taken up to the start
+
+    def steps(self, t: int) -> Steps:
+        return self.offset + abs(t - self.start)
+
+
+class Wire(NamedTuple):
+    horizontal: list[Segment]
+    vertical: list[Segment]
+
+
+def create_wire(wire_str: str, index: int = 0) -> Wire:
     global DIRS
-    pos: Pos = (0, 0)
-    wire: Wire = {}
+    y = x = 0
+    wire = Wire([], [])
     steps: Steps = 0
     for path in wire_str.split(","):
         d_str, num_str = path[0], path[1:]
-        d = DIRS[d_str]
+        dy, dx = DIRS[d_str]
         num = int(num_str)
-        for i in range(1, num+1):
-            pos = (pos[0]+d[0], pos[1]+d[1])
-            steps += 1
-            if pos not in wire:
-                wire[pos] = steps
+        if num == 0:
+            continue
+        if dy == 0:
+            wire.horizontal.append(Segment(index, y, min(x+dx, x+dx*num), max(x+dx, x+dx*num), x, steps))
+        else:
+            wire.vertical.append(Segment(index, x, min(y+dy, y+dy*num), max(y+dy, y+dy*num), y, steps))
+        y, x = y + dy*num, x + dx*num
+        steps += num
     return wire
 
 
-def solve(data: str) -> tuple[int, int]:
-    wire1, wire2 = map(create_wire, data.split("\n"))
-    crossings = set(wire1).intersection(wire2)
-    p1 = min(abs(y)+abs(x) for y, x in crossings)
-    p2 = min(wire1[pos] + wire2[pos] for pos in crossings)
+def perpendicular(horizontal: list[Segment], vertical: list[Segment]) -> list[tuple[Segment, Segment]]:
+    # sweep over x: horizontal segments are active from lo to hi, indexed by y, every vertical segment
+    # queries the active ones within its y range
+    events = sorted([(h.lo, 0, i) for i, h in enumerate(horizontal)] +
+                    [(v.fixed, 1, i) for i, v in enumerate(vertical)] +
+                    [(h.hi, 2, i) for i, h in enumerate(horizontal)])
+    active: list[tuple[int, int]] = []  # (y, index) sorted
+    crossings = []
+    for _, kind, i in events:
+        if kind == 0:
+            insort(active, (horizontal[i].fixed, i))
+        elif kind == 2:
+            del active[bisect_left(active, (horizontal[i].fixed, i))]
+        else:
+            v = vertical[i]
+            for j in range(bisect_left(active, (v.lo, -1)), len(active)):
+                y, k = active[j]
+                if y > v.hi:
+                    break
+                if horizontal[k].wire != v.wire:
+                    crossings.append((horizontal[k], v))
+    return crossings
+
+
+def collinear(segments: list[Segment]) -> list[tuple[Segment, Segment]]:
+    # overlapping segments on the same line
+    lines: defaultdict[int, list[Segment]] = defaultdict(list)
+    for segment in segments:
+        lines[segment.fixed].append(segment)
+    overlaps = []
+    for line in lines.values():
+        line.sort(key=lambda segment: segment.lo)
+        active: list[Segment] = []
+        for segment in line:
+            active = [a for a in active if a.hi >= segment.lo]
+            overlaps.extend((a, segment) for a in active if a.wire != segment.wire)
+            active.append(segment)
+    return overlaps
 
-    return p1, p2
+
+def intersect(wires: list[Wire]) -> dict[Pair, tuple[int, Steps]]:
+    # closest crossing and fewest combined steps for every pair of wires that cross
+    horizontal = [segment for wire in wires for segment in wire.horizontal]
+    vertical = [segment for wire in wires for segment in wire.vertical]
+    best: dict[Pair, tuple[int, Steps]] = {}
+
+    def add(a: Segment, b: Segment, distance: int, steps: Steps) -> None:
+        pair = (min(a.wire, b.wire), max(a.wire, b.wire))
+        if pair in best:
+            distance, steps = min(distance, best[pair][0]), min(steps, best[pair][1])
+        best[pair] = (distance, steps)
+
+    for h, v in perpendicular(horizontal, vertical):
+        add(h, v, abs(h.fixed) + abs(v.fixed), h.steps(v.fixed) + v.steps(h.fixed))
+
+    for a, b in collinear(horizontal) + collinear(vertical):
+        lo, hi = max(a.lo, b.lo), min(a.hi, b.hi)
+        closest = 0 if lo <= 0 <= hi else min(abs(lo), abs(hi))
+        # the combined steps are piecewise linear in t, with kinks only where a segment starts
+        candidates = [t for t in (lo, hi, a.start, b.start) if lo <= t <= hi]
+        add(a, b, abs(a.fixed) + closest, min(a.steps(t) + b.steps(t) for t in candidates))
+    return best
+
+
+def solve(data: str) -> tuple[int, int]:
+    wires = [create_wire(line, i) for i, line in enumerate(data.split())]
+    best = intersect(wires)
+    if (0, 1) not in best:
+        raise ValueError("Wires do not cross.")
+    return best[0, 1]
 
 
 s = timer()
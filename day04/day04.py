@@ -1,39 +1,92 @@
 import os.path
 from timeit import default_timer as timer
 from typing import Iterator
-from collections import Counter
-
-
-# creates valid passwords for part 1 but disregards ranges
-def passwords(digits: list[int] = [], double: bool = False) -> Iterator[list[int]]:
-    n = len(digits)
-    if n == 0:
-        for i in range(1, 10):
-            yield from passwords([i], False)
-    elif n < 5:
-        last = digits[-1]
-        yield from passwords(digits + [last], True)
-        for i in range(last+1, 10):
-            yield from passwords(digits + [i], double)
-    else:  # n == 5
-        last = digits[-1]
-        yield digits + [last]
-        if double:
-            for i in range(last+1, 10):
-                yield digits + [i]
+from functools import cache
+from itertools import groupby
+
+type Counts = tuple[int, int]  # (part 1, part 2)
+
+
+# number of ways to append `remaining` non-decreasing digits to a prefix ending in `last`, which ends in
+# a run of `run` equal digits (3 meaning 3 or more), split by part 1 and part 2 validity of the result
+@cache
+def completions(remaining: int, last: int, run: int, pair: bool, double: bool) -> Counts:
+    if remaining == 0:
+        double = double or run == 2
+        return int(pair), int(double)
+    p1 = p2 = 0
+    for digit in range(last, 10):
+        if digit == last:
+            c1, c2 = completions(remaining-1, digit, min(run+1, 3), True, double)
+        else:
+            c1, c2 = completions(remaining-1, digit, 1, pair, double or run == 2)
+        p1 += c1
+        p2 += c2
+    return p1, p2
+
+
+def count(limit: int) -> Counts:
+    # passwords of any length in [1, limit]
+    if limit < 10:
+        return 0, 0
+    digits = list(map(int, str(limit)))
+    p1 = p2 = 0
+    # all shorter ones
+    for length in range(2, len(digits)):
+        for first in range(1, 10):
+            c1, c2 = completions(length-1, first, 1, False, False)
+            p1, p2 = p1 + c1, p2 + c2
+
+    # same length: follow the digits of limit, every smaller digit at a position frees the rest
+    last, run, pair, double = 0, 0, False, False
+    for i, limit_digit in enumerate(digits):
+        for digit in range(max(last, 1 if i == 0 else 0), limit_digit):
+            if digit == last:
+                c1, c2 = completions(len(digits)-i-1, digit, min(run+1, 3), True, double)
+            else:
+                c1, c2 = completions(len(digits)-i-1, digit, 1, pair, double or run == 2)
+            p1, p2 = p1 + c1, p2 + c2
+        if limit_digit < last:  # limit itself and everything after it decreases
+            return p1, p2
+        if limit_digit == last:
+            run, pair = min(run+1, 3), True
+        else:
+            run, double = 1, double or run == 2
+        last = limit_digit
+    # limit itself
+    return p1 + int(pair), p2 + int(double or run == 2)
 
 
 def solve(pwd_min: int, pwd_max: int) -> tuple[int, int]:
+    # digit DP, polynomial in the number of digits
+    hi1, hi2 = count(pwd_max)
+    lo1, lo2 = count(pwd_min - 1) if pwd_min > 1 else (0, 0)
+    return hi1 - lo1, hi2 - lo2
 
-    p1, p2 = 0, 0
 
-    for digits in passwords():
-        pwd = sum(10**(5-i)*x for i, x in enumerate(digits))
-        if pwd_min <= pwd <= pwd_max:
-            p1 += 1
-            if (2 in Counter(digits).values()):
-                p2 += 1
-    return p1, p2
+def passwords(pwd_min: int, pwd_max: int) -> Iterator[int]:
+    # part 1 passwords in increasing order, subtrees that cannot reach the range are skipped
+    def extend(prefix: int, last: int, pair: bool, remaining: int) -> Iterator[int]:
+        if remaining == 0:
+            if pair and pwd_min <= prefix:
+                yield prefix
+            return
+        for digit in range(last, 10):
+            smallest = int(str(prefix) + str(digit) * remaining)  # the rest repeats the digit
+            largest = prefix * 10**remaining + digit * 10**(remaining-1) + 10**(remaining-1) - 1
+            if smallest > pwd_max:
+                return
+            if largest >= pwd_min:
+                yield from extend(prefix*10 + digit, digit, pair or digit == last, remaining-1)
+
+    for length in range(max(2, len(str(pwd_min))), len(str(pwd_max))+1):
+        for first in range(1, 10):
+            yield from extend(first, first, False, length-1)
+
+
+def has_double(password: int) -> bool:
+    # part 2: a run of exactly two equal digits
+    return any(len(list(run)) == 2 for _, run in groupby(str(password)))
 
 
 s = timer()
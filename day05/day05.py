@@ -4,16 +4,12 @@ from timeit import default_timer as timer
 
 dir_path = os.path.dirname(os.path.realpath(__file__))
 sys.path.append(os.path.join(dir_path, '..', 'Intcode'))
-from Intcode import Computer  # noqa
+from Intcode import Computer, load_program  # noqa
 
 s = timer()
 
 
-input_path = os.path.join(dir_path, "input.txt")
-with open(input_path) as f:
-    data = f.read()
-
-program = list(map(int, data.split(",")))
+program = load_program(os.path.join(dir_path, "input.txt"))
 computer = Computer(program, [1])
 computer.run()
 print("Part 1:", computer.output_values[-1])
@@ -1,49 +1,134 @@
 import os.path
 from timeit import default_timer as timer
-from collections import defaultdict, deque
-from copy import deepcopy
+from typing import NamedTuple
+import numpy as np
+import numpy.typing as npt
 
 type Node = str
-type Graph = defaultdict[Node, list[Node]]
+type Ids = npt.NDArray[np.int64]
+
+
+class Graph(NamedTuple):
+    # objects interned to ids 0..n-1, the objects orbiting i are children[offsets[i]:offsets[i+1]]
+    names: list[Node]
+    ids: dict[Node, int]
+    parent: Ids  # -1 for objects that orbit nothing
+    offsets: Ids
+    children: Ids
+    depth: Ids  # orbits from the root of the object's tree
+    root: Ids
+
+    def orbiters(self, node: Node) -> list[Node]:
+        i = self.ids[node]
+        return [self.names[c] for c in self.children[self.offsets[i]:self.offsets[i+1]]]
+
+
+def depths(parent: Ids) -> tuple[Ids, Ids]:
+    # pointer jumping: after round k every object knows its 2**k-th ancestor and the distance to it,
+    # so a chain of any length takes O(log n) vectorized rounds instead of one recursion level per orbit
+    n = len(parent)
+    roots = parent < 0
+    anc = np.where(roots, np.arange(n), parent)
+    depth = (~roots).astype(np.int64)
+    for _ in range(n.bit_length() + 1):
+        if np.array_equal(anc[anc], anc):
+            break
+        depth += depth[anc]
+        anc = anc[anc]
+    # in a tree everything ends at a root; cycles either never settle or, for a self-orbit or a cycle
+    # whose length is a power of two, settle on one of their own objects
+    if not roots[anc].all():
+        raise ValueError("Orbits contain a cycle.")
+    return depth, anc
 
 
 def create_graph(data: str) -> Graph:
-    graph = defaultdict(list)
-    for line in data.splitlines():
-        node_from, node_to = line.split(")")
-        graph[node_from].append(node_to)
-    return graph
-
-
-def part1(graph: Graph) -> int:
-
-    # graph is a DAG
-    # the sums are eventually empty
-    def pathlengths(curr: Node, length: int) -> int:
-        return length + sum(pathlengths(n, length+1) for n in graph[curr])
-
-    return pathlengths("COM", 0)
-
-
-def part2(graph: Graph) -> int:
-    # add reverse edges
-    for node_from, node_to in deepcopy(graph).items():
-        for node in node_to:
-            graph[node].append(node_from)
-
-    q: deque[tuple[Node, int]] = deque([("YOU", 0)])
-    seen: set[Node] = set()
-    while q:
-        node, length = q.pop()
-        seen.add(node)
-        # path is unique
-        if node == "SAN":
-            return length-2
-        for n in graph[node]:
-            if n not in seen:
-                q.append((n, length+1))
-    else:
+    tokens = data.replace(")", " ").split()
+    names = list(dict.fromkeys(tokens))
+    ids = dict(zip(names, range(len(names))))
+    codes = np.fromiter(map(ids.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+    del tokens
+    centers, orbiters = codes[0::2], codes[1::2]
+
+    n = len(names)
+    parent = np.full(n, -1, dtype=np.int64)
+    parent[orbiters] = centers
+    if np.count_nonzero(parent >= 0) != len(orbiters):
+        raise ValueError("An object orbits more than one center.")
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(centers, minlength=n), out=offsets[1:])
+    children = orbiters[np.argsort(centers, kind="stable")]
+    return Graph(names, ids, parent, offsets, children, *depths(parent))
+
+
+def part1(graph: Graph, root: Node = "COM") -> int:
+    # direct and indirect orbits of everything around the root
+    if root not in graph.ids:
+        return 0
+    return int(graph.depth[graph.root == graph.ids[root]].sum())
+
+
+class OrbitIndex:
+    """Depths and a binary lifting table of the orbit tree, built once.
+
+    up[k][i] is the 2**k-th ancestor of object i (a root is its own parent), so the lowest common
+    ancestor of two objects takes O(log n) steps, for single queries as well as for NumPy arrays of them.
+    """
+
+    def __init__(self, graph: Graph) -> None:
+        self.names = graph.names
+        self.ids = graph.ids
+        self.depth = graph.depth
+        self.root = graph.root
+        n = len(self.depth)
+        levels = max(1, int(self.depth.max(initial=0)).bit_length())
+        self.up = np.empty((levels, n), dtype=np.int64)
+        self.up[0] = np.where(graph.parent < 0, np.arange(n), graph.parent)
+        for k in range(1, levels):
+            self.up[k] = self.up[k-1][self.up[k-1]]
+
+    def lca_ids(self, a: npt.NDArray[np.int64], b: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+        # element-wise lowest common ancestor, -1 for objects in different trees
+        a, b = np.array(a, dtype=np.int64), np.array(b, dtype=np.int64)
+        apart = self.root[a] != self.root[b]
+        swap = self.depth[a] < self.depth[b]
+        a[swap], b[swap] = b[swap], a[swap]  # a is the deeper one
+        diff = self.depth[a] - self.depth[b]
+        for k in range(len(self.up)):
+            lift = (diff >> k) & 1 == 1
+            a[lift] = self.up[k][a[lift]]
+        for k in reversed(range(len(self.up))):
+            differ = self.up[k][a] != self.up[k][b]
+            a[differ], b[differ] = self.up[k][a[differ]], self.up[k][b[differ]]
+        return np.where(apart, -1, np.where(a == b, a, self.up[0][a]))
+
+    def distances(self, a: npt.NDArray[np.int64], b: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+        # orbit steps between the objects with ids a and b, element-wise, -1 for objects in different trees
+        lca = self.lca_ids(a, b)
+        return np.where(lca < 0, -1, self.depth[a] + self.depth[b] - 2 * self.depth[lca])
+
+    def lca(self, a: Node, b: Node) -> Node:
+        lca = int(self.lca_ids(np.array([self.ids[a]]), np.array([self.ids[b]]))[0])
+        if lca < 0:
+            raise ValueError(f"{a} and {b} orbit in different systems.")
+        return self.names[lca]
+
+    def distance(self, a: Node, b: Node) -> int:
+        distance = int(self.distances(np.array([self.ids[a]]), np.array([self.ids[b]]))[0])
+        if distance < 0:
+            raise ValueError(f"{a} and {b} orbit in different systems.")
+        return distance
+
+    def transfers(self, a: Node, b: Node) -> int:
+        # orbital transfers to get from the object a orbits to the one b orbits
+        return self.distance(a, b) - 2
+
+
+def part2(index: OrbitIndex) -> int:
+    if ("YOU" not in index.ids or "SAN" not in index.ids
+            or index.root[index.ids["YOU"]] != index.root[index.ids["SAN"]]):
         raise ValueError("Path to Santa not found :(")
+    return index.transfers("YOU", "SAN")
 
 
 s = timer()
@@ -56,7 +141,7 @@ with open(input_path) as f:
 
 graph = create_graph(data)
 print("Part 1:", part1(graph))
-print("Part 2:", part2(graph))
+print("Part 2:", part2(OrbitIndex(graph)))
 
 e = timer()
 print(f"time: {e-s}")
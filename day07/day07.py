@@ -1,57 +1,126 @@
 import os.path
 import sys
+import asyncio
 from timeit import default_timer as timer
-from itertools import permutations
+from typing import Sequence
 
 dir_path = os.path.dirname(os.path.realpath(__file__))
 sys.path.append(os.path.join(dir_path, '..', 'Intcode'))
-from Intcode import Computer  # noqa
+from Intcode import Computer, Program, Status, load_program  # noqa
+from aio import AsyncComputer  # noqa
+from symbolic import Affine, SymbolicError, Term, run_symbolic  # noqa
 
 
-def sim(program: list[int], phase_setting: tuple[int, ...]) -> int:
-    inp = 0
-    computer = Computer(program, [])
-    for phase in phase_setting:
-        computer.load(program, [phase, inp])
-        computer.run()
-        inp = computer.output_values[-1]
-    return inp
+class Amplifiers:
+    """Runs of one amplifier program, every distinct (phase, signal) pair runs once.
 
+    If run_symbolic can follow the program for a phase, its output is an affine function of the input
+    signal, which replaces the runs and tells whether a larger signal always gives a larger output.
+    """
 
-def max_thrusters(program: list[int]) -> int:
-    # brute force
-    return max(sim(program, phase_setting) for phase_setting in permutations(range(5)))
+    def __init__(self, program: Program) -> None:
+        self.program = program
+        self.amplifier = Computer(program, [])
+        self.outputs: dict[tuple[int, int], int] = {}
+        self.transfers: dict[int, Term | None] = {}
 
-
-def feedback(program: list[int], phase_setting: tuple[int, ...]) -> int:
-    computers: list[Computer] = [Computer(program, [phase]) for phase in phase_setting]
-    inp = 0
-    output = 0
-    while inp is not None:
-        for computer in computers:
-            computer.add_input(inp)
+    def transfer(self, phase: int) -> Term | None:
+        if phase not in self.transfers:
             try:
-                inp = next(computer)
-            except StopIteration:
-                inp = None
-                break
-            output = inp
-    return output
+                output_values = run_symbolic(self.program, input_values=[phase, Affine.symbol("signal")]).output_values
+            except SymbolicError:  # the program branches on the signal
+                output_values = []
+            last = output_values[-1] if output_values else None
+            self.transfers[phase] = last if isinstance(last, int | Affine) else None
+        return self.transfers[phase]
 
+    def monotone(self, phase: int) -> bool:
+        f = self.transfer(phase)
+        return isinstance(f, int) or (isinstance(f, Affine) and f.coefficients.get("signal", 0) >= 0)
 
-def max_feedback(program: list[int]) -> int:
-    # brute force
-    return max(feedback(program, phase_setting) for phase_setting in permutations(range(5, 10)))
+    def __call__(self, phase: int, signal: int) -> int:
+        key = (phase, signal)
+        if key not in self.outputs:
+            f = self.transfer(phase)
+            if isinstance(f, Affine):
+                self.outputs[key] = f.evaluate({"signal": signal})
+            elif isinstance(f, int):
+                self.outputs[key] = f
+            else:
+                computer = self.amplifier.fork()
+                computer.input_values.extend((phase, signal))
+                computer.run()
+                self.outputs[key] = computer.output_values[-1]
+        return self.outputs[key]
 
 
-s = timer()
+def max_thrusters(program: Program, phases: Sequence[int] = range(5)) -> int:
+    amplify = Amplifiers(program)
+    if all(amplify.monotone(phase) for phase in phases):
+        # dominance: after the same set of phases the larger signal can only end larger, so only the best
+        # signal per set survives, 2**n * n runs instead of n!
+        best: dict[int, int] = {0: 0}  # bit mask of the used phases: signal
+        for _ in phases:
+            layer: dict[int, int] = {}
+            for used, signal in best.items():
+                for i, phase in enumerate(phases):
+                    if not used >> i & 1:
+                        output = amplify(phase, signal)
+                        layer[used | 1 << i] = max(output, layer.get(used | 1 << i, output))
+            best = layer
+        return max(best.values())
+
+    # walk the permutation tree, every prefix runs its last amplifier once
+    def search(signal: int, remaining: tuple[int, ...]) -> int:
+        if not remaining:
+            return signal
+        return max(search(amplify(phase, signal), remaining[:i] + remaining[i+1:])
+                   for i, phase in enumerate(remaining))
+
+    return search(0, tuple(phases))
+
+
+async def feedback(machines: list[AsyncComputer], signal: int) -> int:
+    # the amplifiers are past their phase and first signal; amplifier i reads from channel i and writes to
+    # channel i+1, the last one feeds the first one. The machines are forked, so they can be reused.
+    channels: list[asyncio.Queue[int]] = [asyncio.Queue() for _ in machines]
+    computers: list[AsyncComputer] = [machine.fork() for machine in machines]
+    for i, computer in enumerate(computers):
+        computer.connect(channels[i], channels[(i+1) % len(channels)])
+    channels[0].put_nowait(signal)
+    await asyncio.gather(*(computer.run_async() for computer in computers))
+    # the first amplifier halted before reading the last signal
+    return channels[0].get_nowait()
+
 
+def max_feedback(program: Program, phases: Sequence[int] = range(5, 10)) -> int:
+    # the first pass through the loop only depends on the phases so far: every prefix starts its last
+    # amplifier once, leaves it waiting for its next signal, and all permutations of the rest fork from it
+    amplifier = AsyncComputer(program, [])
+
+    def start(phase: int, signal: int) -> tuple[AsyncComputer, int]:
+        computer = amplifier.fork()
+        computer.input_values.extend((phase, signal))
+        if computer.run_until(1) is not Status.OUTPUT_READY:
+            raise ValueError(f"Amplifier with phase {phase} produced no signal.")
+        return computer, computer.take_outputs()[-1]
+
+    async def search(machines: list[AsyncComputer], signal: int, remaining: tuple[int, ...]) -> int:
+        if not remaining:
+            return await feedback(machines, signal)
+        thrusts = []
+        for i, phase in enumerate(remaining):
+            computer, output = start(phase, signal)
+            thrusts.append(await search(machines + [computer], output, remaining[:i] + remaining[i+1:]))
+        return max(thrusts)
+
+    return asyncio.run(search([], 0, tuple(phases)))
+
+
+s = timer()
 
-input_path = os.path.join(dir_path, "input.txt")
-with open(input_path) as f:
-    data = f.read()
 
-program = list(map(int, data.split(",")))
+program = load_program(os.path.join(dir_path, "input.txt"))
 print("Part 1:", max_thrusters(program))
 print("Part 2:", max_feedback(program))
 
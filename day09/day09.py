@@ -4,7 +4,7 @@ from timeit import default_timer as timer
 
 dir_path = os.path.dirname(os.path.realpath(__file__))
 sys.path.append(os.path.join(dir_path, '..', 'Intcode'))
-from Intcode import Computer  # noqa
+from Intcode import Computer, load_program  # noqa
 
 
 def boost(program: list[int], inp: int) -> int:
@@ -18,11 +18,7 @@ def boost(program: list[int], inp: int) -> int:
 s = timer()
 
 
-input_path = os.path.join(dir_path, "input.txt")
-with open(input_path) as f:
-    data = f.read()
-
-program = list(map(int, data.split(",")))
+program = load_program(os.path.join(dir_path, "input.txt"))
 print("Part 1:", boost(program, 1))
 print("Part 2:", boost(program, 2))
 
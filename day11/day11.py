@@ -1,82 +1,114 @@
 import os.path
 import sys
 from timeit import default_timer as timer
+from itertools import batched
+import numpy as np
+import numpy.typing as npt
 
-type Pos = complex  # y downwards
-type Dir = complex
 type Color = int
 
 dir_path = os.path.dirname(os.path.realpath(__file__))
 sys.path.append(os.path.join(dir_path, '..', 'Intcode'))
-from Intcode import Computer  # noqa
+from Intcode import Computer, Status, load_program  # noqa
+
+# the hull is made of CHUNK x CHUNK tiles, allocated when the robot first gets there
+CHUNK_BITS = 6
+CHUNK = 1 << CHUNK_BITS
+CHUNK_MASK = CHUNK - 1
+
+# cell flags
+WHITE = 1
+VISITED = 2
+
+# color requests of the robot before paint_hull gives up, far beyond any real input
+MAX_STEPS = 1 << 40
+
+
+class Hull:
+    __slots__ = ["chunks"]
+
+    def __init__(self) -> None:
+        self.chunks: dict[tuple[int, int], npt.NDArray[np.uint8]] = {}
+
+    def chunk(self, y: int, x: int) -> npt.NDArray[np.uint8]:
+        key = (y >> CHUNK_BITS, x >> CHUNK_BITS)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = np.zeros((CHUNK, CHUNK), dtype=np.uint8)
+        return chunk
+
+    def visited(self) -> int:
+        return sum(int(np.count_nonzero(chunk & VISITED)) for chunk in self.chunks.values())
+
+    def render(self) -> str:
+        # all chunks are copied into one image, cropped to the white panels and turned into text at once
+        if not self.chunks:
+            return ""
+        keys = np.array(list(self.chunks))
+        y_min, x_min = keys.min(axis=0)
+        y_max, x_max = keys.max(axis=0)
+        image = np.zeros(((y_max - y_min + 1) * CHUNK, (x_max - x_min + 1) * CHUNK), dtype=bool)
+        for (y, x), chunk in self.chunks.items():
+            image[(y-y_min)*CHUNK:(y-y_min+1)*CHUNK, (x-x_min)*CHUNK:(x-x_min+1)*CHUNK] = chunk & WHITE
+        ys, xs = np.nonzero(image)
+        if len(ys) == 0:
+            return ""
+        image = image[ys.min():ys.max()+1, xs.min():xs.max()+1]
+        return "\n".join(map("".join, np.where(image, "█", " ")))
 
 
 # 0 = black, 1 = white
-def paint_hull(program: list[int], start_color: int) -> tuple[int, set[Pos]]:
+def paint_hull(program: list[int], start_color: Color, max_steps: int = MAX_STEPS) -> tuple[int, Hull]:
     computer = Computer(program, [])
-    pos: Pos = 0
-    d: Dir = -1j
-    visited: set[Pos] = set({pos})
-    white_panels: set[Pos] = set()
-    curr_color: Color = start_color
-
-    for _ in range(10**6):
-        computer.add_input(curr_color)
-        try:
-            to_paint = next(computer)
-        except StopIteration:
+    hull = Hull()
+    y = x = 0
+    dy, dx = -1, 0  # y downwards
+    chunk = hull.chunk(y, x)
+    chunk[0, 0] = VISITED | start_color
+
+    for _ in range(max_steps):
+        computer.add_input(int(chunk[y & CHUNK_MASK, x & CHUNK_MASK]) & WHITE)
+        status = computer.run_until()
+        # all (color, turn) pairs produced until the robot asks for the next color
+        for instruction in batched(computer.take_outputs(), 2):
+            to_paint = instruction[0]
+            if to_paint not in (0, 1):
+                raise ValueError(f"Colorcode {to_paint} unknown.")
+            chunk[y & CHUNK_MASK, x & CHUNK_MASK] = VISITED | to_paint
+
+            if len(instruction) < 2:  # halted in between
+                break
+            turn = instruction[1]
+            if turn == 0:  # left 90 degrees
+                dy, dx = -dx, dy
+            elif turn == 1:  # right 90 degrees
+                dy, dx = dx, -dy
+            else:
+                raise ValueError(f"Turn instruction {turn} unknown.")
+            if (y ^ (y + dy)) >> CHUNK_BITS or (x ^ (x + dx)) >> CHUNK_BITS:  # next chunk
+                chunk = hull.chunk(y + dy, x + dx)
+            y += dy
+            x += dx
+            chunk[y & CHUNK_MASK, x & CHUNK_MASK] |= VISITED
+        if status is Status.HALTED:
             break
-        if to_paint == 0:  # black
-            white_panels -= {pos}
-        elif to_paint == 1:  # white
-            white_panels |= {pos}
-        else:
-            raise ValueError(f"Colorcode {to_paint} unknown.")
-
-        try:
-            turn = next(computer)
-        except StopIteration:
-            break
-        if turn == 0:  # left 90 degrees
-            d *= -1j
-        elif turn == 1:  # right 90 degrees
-            d *= 1j
-        else:
-            raise ValueError(f"Turn instruction {turn} unknown.")
-        pos += d
-        visited.add(pos)
-        curr_color = 1 if pos in white_panels else 0
     else:
         raise ValueError("Max iterations reached.")
 
-    return len(visited), white_panels
-
-
-def print_hull(white_panels: set[Pos]) -> None:
-    panels = [(int(z.imag), int(z.real)) for z in white_panels]
-    y_max, x_max = map(max, *panels)
-    y_min, x_min = map(min, *panels)
-    for y in range(y_min, y_max+1):
-        for x in range(x_min, x_max+1):
-            print("█" if x+y*1j in white_panels else " ", end="")
-        print()
+    return hull.visited(), hull
 
 
 s = timer()
 
 
-input_path = os.path.join(dir_path, "input.txt")
-with open(input_path) as f:
-    data = f.read()
-
-program = list(map(int, data.split(",")))
+program = load_program(os.path.join(dir_path, "input.txt"))
 
-num_visited, white_panels = paint_hull(program, 0)
+num_visited, hull = paint_hull(program, 0)
 print("Part 1:", num_visited)
 
-num_visited, white_panels = paint_hull(program, 1)
+num_visited, hull = paint_hull(program, 1)
 print("Part 2:")
-print_hull(white_panels)
+print(hull.render())
 
 
 e = timer()
@@ -1,76 +1,85 @@
 import os.path
 import sys
-import os
 from timeit import default_timer as timer
-from typing import Generator, Any
+from typing import NamedTuple
+import numpy as np
+import numpy.typing as npt
 
 
 dir_path = os.path.dirname(os.path.realpath(__file__))
 sys.path.append(os.path.join(dir_path, '..', 'Intcode'))
-from Intcode import Computer  # noqa
+from Intcode import Computer, Status, load_program  # noqa
 
+EMPTY, WALL, BLOCK, PADDLE, BALL = range(5)
 
-def game_control_gen(program: list[int]) -> Generator[tuple[int, int, int], int | None, None]:
+
+class Game(NamedTuple):
+    score: int
+    screen: npt.NDArray[np.int8] | None  # tile ids by (y, x), None when fast-forwarded
+    frames: int
+
+
+def draw(screen: npt.NDArray[np.int8], tiles: npt.NDArray[np.int64]) -> npt.NDArray[np.int8]:
+    # tiles: (x, y, tile) rows in output order
+    x, y, tile = tiles.T
+    height, width = max(screen.shape[0], y.max() + 1), max(screen.shape[1], x.max() + 1)
+    if (height, width) != screen.shape:
+        screen = np.pad(screen, ((0, height - screen.shape[0]), (0, width - screen.shape[1])))
+    # a cell drawn twice in one frame keeps the later tile
+    cells = (y * width + x)[::-1]
+    _, last = np.unique(cells, return_index=True)
+    last = len(cells) - 1 - last
+    screen[y[last], x[last]] = tile[last]
+    return screen
+
+
+def play(program: list[int], fast_forward: bool = False) -> Game:
+    # one frame per input request: all outputs up to it go through numpy at once, then the paddle follows the ball
     computer = Computer(program, [])
-    try:
-        for _ in range(10**6):
-            x = next(computer)
-            y = next(computer)
-            tile = next(computer)
-            computer.input_default = yield (x, y, tile)
-        else:
-            raise ValueError("Max iterations reached.")
-    except StopIteration:
-        pass
+    screen = np.zeros((0, 0), dtype=np.int8)
+    score = ball_x = paddle_x = frames = 0
+
+    for _ in range(10**6):
+        status = computer.run_until()
+        outputs = np.array(computer.take_outputs(), dtype=np.int64).reshape(-1, 3)
+        if len(outputs) > 0:
+            is_score = outputs[:, 0] == -1
+            if is_score.any():
+                score = int(outputs[is_score, 2][-1])
+            tiles = outputs[~is_score]
+            if not fast_forward and len(tiles) > 0:
+                screen = draw(screen, tiles)
+            balls, paddles = tiles[tiles[:, 2] == BALL, 0], tiles[tiles[:, 2] == PADDLE, 0]
+            ball_x = balls[-1] if len(balls) > 0 else ball_x
+            paddle_x = paddles[-1] if len(paddles) > 0 else paddle_x
+        frames += 1
+
+        if status is Status.HALTED:
+            break
+        # sufficient to only "follow" in x-direction
+        computer.add_input(int(np.sign(ball_x - paddle_x)))
+    else:
+        raise ValueError("Max iterations reached.")
+
+    return Game(score, None if fast_forward else screen, frames)
 
 
 def get_blocks(program: list[int]) -> int:
-    game = game_control_gen(program)
-    return sum(tile == 2 for (x, y, tile) in game)
+    screen = play(program).screen
+    assert screen is not None
+    return int(np.count_nonzero(screen == BLOCK))
 
 
 def beat_game(program: list[int]) -> int:
+    program = list(program)  # the cached program is read-only
     program[0] = 2
-    game = game_control_gen(program)
-    next(game)  # we miss a single pixel
-    score = ball_x = bar_x = joystick = 0
-
-    try:
-        for _ in range(10**6):
-            (x, y, tile) = game.send(joystick)
-
-            if x == -1:
-                score = tile
-                continue
-
-            if tile == 3:
-                bar_x = x
-            elif tile == 4:
-                ball_x = x
-
-            # sufficient to only "follow" in x-direction
-            if ball_x < bar_x:
-                joystick = -1
-            elif ball_x > bar_x:
-                joystick = 1
-            else:
-                joystick = 0
-        else:
-            raise ValueError("Max iterations reached.")
-    except StopIteration:
-        pass
-
-    return score
+    return play(program, fast_forward=True).score
 
 
 s = timer()
 
 
-input_path = os.path.join(dir_path, "input.txt")
-with open(input_path) as f:
-    data = f.read()
-
-program = list(map(int, data.split(",")))
+program = load_program(os.path.join(dir_path, "input.txt"))
 
 print("Part 1:", get_blocks(program))
 print("Part 2:", beat_game(program))
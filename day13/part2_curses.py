@@ -14,21 +14,14 @@ use a dedicated powershell
 
 dir_path = os.path.dirname(os.path.realpath(__file__))
 sys.path.append(os.path.join(dir_path, '..', 'Intcode'))
-from Intcode import Computer  # noqa
+from Intcode import Computer, load_program  # noqa
 
 
 def game_control_gen(program: list[int]) -> Generator[tuple[int, int, int], int | None, None]:
     computer = Computer(program, [])
-    try:
-        for _ in range(10**6):
-            x = next(computer)
-            y = next(computer)
-            tile = next(computer)
-            computer.input_default = yield (x, y, tile)
-        else:
-            raise ValueError("Max iterations reached.")
-    except StopIteration:
-        pass
+    # one re-entry per (x, y, tile) triple
+    for x, y, tile in computer.records(3):
+        computer.input_default = yield (x, y, tile)
 
 
 TILES = [" ", "█", "⬚", "▬", "●"]
@@ -123,10 +116,7 @@ def main(stdscr, program: list[int]):
 
 if __name__ == "__main__":
 
-    input_path = os.path.join(dir_path, "input.txt")
-    with open(input_path) as f:
-        data = f.read()
-    program = list(map(int, data.split(",")))
+    program = list(load_program(os.path.join(dir_path, "input.txt")))
     program[0] = 2
 
     wrapper(main, program)